@@ -14,6 +14,13 @@ DATABASE_URL = os.getenv("DATABASE_URL", "")
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
 
+# Sentiment model keys in item_scores.model (must match jobs/model_keys.py).
+# Reads use the active scoring_models row (db.get_active_score_models) and
+# prefer the full-text score, falling back to the headline-tier score.
+# SCORE_MODEL_KEY pins the key regardless of the DB.
+DEFAULT_SCORE_MODEL = "hf_fin_v1"
+SCORE_MODEL_OVERRIDE = os.getenv("SCORE_MODEL_KEY", "")
+
 # Parse DATABASE_URL for psycopg2 if needed
 def get_db_config():
     """Parse DATABASE_URL into connection params."""
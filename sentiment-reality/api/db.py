@@ -2,7 +2,7 @@
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from contextlib import contextmanager
-from config import get_db_config
+from config import get_db_config, DEFAULT_SCORE_MODEL, SCORE_MODEL_OVERRIDE
 
 def is_configured() -> bool:
     """Check if database is configured."""
@@ -44,3 +44,14 @@ def execute_returning(sql: str, params: tuple = None) -> dict | None:
             conn.commit()
             row = cur.fetchone()
             return dict(row) if row else None
+
+def get_active_score_models() -> tuple[str, str]:
+    """Return (full-text key, headline key) of the active sentiment model."""
+    model = SCORE_MODEL_OVERRIDE
+    if not model:
+        try:
+            rows = query("SELECT model_key FROM scoring_models WHERE is_active")
+            model = rows[0]["model_key"] if rows else DEFAULT_SCORE_MODEL
+        except Exception:
+            model = DEFAULT_SCORE_MODEL
+    return model, f"{model}_headline"
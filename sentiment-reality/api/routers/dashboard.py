@@ -11,7 +11,7 @@ router = APIRouter()
 
 # Try to import db, fall back to mock data if DB not configured
 try:
-    from db import query, is_configured
+    from db import query, is_configured, get_active_score_models
     DB_AVAILABLE = True
 except Exception:
     DB_AVAILABLE = False
@@ -70,6 +70,7 @@ def get_dashboard(
         """, (ticker, start_date))
 
         # Fetch recent headlines with scores
+        score_model, headline_model = get_active_score_models()
         headlines_raw = query("""
             SELECT
                 i.id::text,
@@ -82,11 +83,17 @@ def get_dashboard(
                 i.snippet,
                 i.url
             FROM items i
-            LEFT JOIN item_scores s ON i.id = s.item_id AND s.model = 'hf_fin_v1'
+            LEFT JOIN LATERAL (
+                SELECT sentiment_label, sentiment_score, confidence
+                FROM item_scores
+                WHERE item_id = i.id AND model IN (%s, %s)
+                ORDER BY (model = %s) DESC
+                LIMIT 1
+            ) s ON true
             WHERE i.ticker = %s
             ORDER BY i.published_at DESC
             LIMIT %s
-        """, (ticker, headlines_limit))
+        """, (score_model, headline_model, score_model, ticker, headlines_limit))
 
         # Build daily_data by joining on date
         prices_by_date = {str(p["date"]): p for p in prices}
@@ -6,7 +6,7 @@ router = APIRouter()
 
 # Import DB, fall back gracefully
 try:
-    from db import query, is_configured
+    from db import query, is_configured, get_active_score_models
     DB_AVAILABLE = True
 except Exception:
     DB_AVAILABLE = False
@@ -25,6 +25,7 @@ def get_headlines_by_date(
     if not DB_AVAILABLE or not is_configured():
         return []
 
+    score_model, headline_model = get_active_score_models()
     rows = query("""
         SELECT
             i.id::text,
@@ -37,11 +38,17 @@ def get_headlines_by_date(
             i.snippet,
             i.url
         FROM items i
-        LEFT JOIN item_scores s ON i.id = s.item_id AND s.model = 'hf_fin_v1'
+        LEFT JOIN LATERAL (
+            SELECT sentiment_label, sentiment_score, confidence
+            FROM item_scores
+            WHERE item_id = i.id AND model IN (%s, %s)
+            ORDER BY (model = %s) DESC
+            LIMIT 1
+        ) s ON true
         WHERE i.ticker = %s AND DATE(i.published_at) = %s
         ORDER BY i.published_at DESC
         LIMIT %s
-    """, (ticker, date, limit))
+    """, (score_model, headline_model, score_model, ticker, date, limit))
 
     return [NewsItem(
         id=r.get("id"),
@@ -92,6 +92,10 @@ CREATE TABLE IF NOT EXISTS items (
 CREATE INDEX IF NOT EXISTS idx_items_ticker_published
     ON items(ticker, published_at);
 
+-- URL-only lookups (ingest_to_db.get_article_by_url); dedup uses (source, url)
+CREATE INDEX IF NOT EXISTS idx_items_url
+    ON items(url);
+
 -- ============================================
 -- E) item_scores - ML sentiment outputs (append-only per model)
 -- ============================================
@@ -157,4 +161,123 @@ CREATE TABLE IF NOT EXISTS current_prices (
 );
 
 CREATE INDEX IF NOT EXISTS idx_current_prices_updated_at
-    ON current_prices(updated_at DESC);
\ No newline at end of file
+    ON current_prices(updated_at DESC);
+
+-- ============================================
+-- I) score_cache - sentiment scores keyed by article content hash
+-- ============================================
+-- Syndicated copies of the same story (different URLs/tickers) share one
+-- entry per model. minhash/lsh_bands are only set when near-duplicate
+-- matching is enabled in the jobs (SCORE_CACHE_NEAR_DUP=1).
+CREATE TABLE IF NOT EXISTS score_cache (
+    text_hash TEXT NOT NULL,  -- sha256 of normalized article text
+    model TEXT NOT NULL,
+    sentiment_label TEXT NOT NULL,
+    sentiment_score DOUBLE PRECISION NOT NULL,
+    confidence DOUBLE PRECISION NOT NULL,
+    minhash BIGINT[] NULL,
+    lsh_bands TEXT[] NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (text_hash, model)
+);
+
+CREATE INDEX IF NOT EXISTS idx_score_cache_lsh_bands
+    ON score_cache USING GIN (lsh_bands);
+
+-- ============================================
+-- J) scoring_models - model key registry (item_scores.model)
+-- ============================================
+-- Exactly one row is active; jobs and the API score and read with it.
+-- Switching models = re-score history under a new key, then flip is_active.
+CREATE TABLE IF NOT EXISTS scoring_models (
+    model_key TEXT PRIMARY KEY,
+    model_name TEXT NOT NULL,  -- HuggingFace model id
+    is_active BOOLEAN NOT NULL DEFAULT false,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    activated_at TIMESTAMPTZ NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_scoring_models_one_active
+    ON scoring_models(is_active) WHERE is_active;
+
+INSERT INTO scoring_models (model_key, model_name, is_active, activated_at)
+VALUES ('hf_fin_v1', 'mrm8488/distilroberta-finetuned-financial-news-sentiment-analysis', true, now())
+ON CONFLICT (model_key) DO NOTHING;
+
+-- ============================================
+-- K) rescore_runs - progress checkpoints for bulk re-scoring
+-- ============================================
+CREATE TABLE IF NOT EXISTS rescore_runs (
+    id BIGSERIAL PRIMARY KEY,
+    model_key TEXT NOT NULL,
+    tier TEXT NOT NULL DEFAULT 'full',  -- full | headline
+    status TEXT NOT NULL DEFAULT 'RUNNING',  -- RUNNING | DONE | ERROR
+    last_item_id UUID NULL,  -- keyset checkpoint: items are processed in id order
+    items_seen INT NOT NULL DEFAULT 0,
+    items_scored INT NOT NULL DEFAULT 0,
+    errors INT NOT NULL DEFAULT 0,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    finished_at TIMESTAMPTZ NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_rescore_runs_model_status
+    ON rescore_runs(model_key, status);
+
+-- ============================================
+-- L) item_texts - extracted article text per item
+-- ============================================
+-- Written when scoring downloads an article, read first on every later
+-- (re-)scoring run. Failed fetches are stored too (empty text + status) so
+-- permanent failures are not retried. Postgres compresses long text (TOAST).
+CREATE TABLE IF NOT EXISTS item_texts (
+    item_id UUID PRIMARY KEY REFERENCES items(id) ON DELETE CASCADE,
+    text_hash TEXT NULL,  -- sha256 of normalized text (same as score_cache)
+    text TEXT NOT NULL DEFAULT '',
+    fetch_status TEXT NOT NULL,  -- ok | empty | http_<code> | timeout | error
+    fetched_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- ============================================
+-- M) api_budget - daily request ledger for metered APIs (e.g. NewsAPI)
+-- ============================================
+CREATE TABLE IF NOT EXISTS api_budget (
+    provider TEXT NOT NULL,
+    day DATE NOT NULL,  -- UTC
+    requests INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (provider, day)
+);
+
+-- ============================================
+-- N) news_fetch_state - incremental NewsAPI fetch watermark per ticker
+-- ============================================
+-- watermark only advances after a fetch that read every page. A run cut
+-- short (request budget, result cap) read the newest pages first, so the
+-- next run resumes below the oldest article it read (backfill_to) until the
+-- gap down to the watermark is covered.
+CREATE TABLE IF NOT EXISTS news_fetch_state (
+    ticker TEXT PRIMARY KEY,
+    watermark TIMESTAMPTZ NULL,  -- newest published_at seen in a complete fetch
+    backfill_to TIMESTAMPTZ NULL,  -- oldest published_at read by an unfinished fetch
+    pending_watermark TIMESTAMPTZ NULL,  -- watermark once that fetch is finished
+    last_requests INT NOT NULL DEFAULT 0,
+    last_complete BOOLEAN NOT NULL DEFAULT false,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+ALTER TABLE news_fetch_state ADD COLUMN IF NOT EXISTS backfill_to TIMESTAMPTZ NULL;
+ALTER TABLE news_fetch_state ADD COLUMN IF NOT EXISTS pending_watermark TIMESTAMPTZ NULL;
+
+-- ============================================
+-- O) score_leases - short-lived claims on items being scored
+-- ============================================
+-- score_unscored_global claims items here in a short transaction, scores
+-- them outside any transaction and deletes the leases when the scores are
+-- written. A scorer that dies leaves leases that simply expire.
+CREATE TABLE IF NOT EXISTS score_leases (
+    item_id UUID NOT NULL REFERENCES items(id) ON DELETE CASCADE,
+    model TEXT NOT NULL,  -- item_scores.model key being written
+    leased_until TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (item_id, model)
+);
@@ -0,0 +1,45 @@
+"""
+Daily request budget ledger for metered external APIs (api_budget table).
+
+Every request is reserved before it is sent with one atomic upsert, so
+concurrent workers can never overspend a provider's daily quota between
+them. Days are UTC, matching NewsAPI's quota reset.
+
+Without a database the ledger is not enforced (reservations always succeed);
+callers still apply their own per-run caps.
+"""
+from db import fetch_all, is_configured, transaction
+
+
+def reserve_request(provider: str, daily_limit: int) -> bool:
+    """Reserve one request for today. Returns False if the budget is spent."""
+    if not is_configured():
+        return True
+
+    with transaction() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO api_budget (provider, day, requests)
+                VALUES (%s, (now() AT TIME ZONE 'utc')::date, 1)
+                ON CONFLICT (provider, day) DO UPDATE
+                    SET requests = api_budget.requests + 1, updated_at = now()
+                    WHERE api_budget.requests < %s
+                RETURNING requests
+            """, (provider, daily_limit))
+            row = cur.fetchone()
+
+    # A fresh row is created even when daily_limit is 0
+    return row is not None and row[0] <= daily_limit
+
+
+def remaining_requests(provider: str, daily_limit: int) -> int:
+    """Requests left in today's budget (daily_limit without a database)."""
+    if not is_configured():
+        return daily_limit
+
+    rows = fetch_all("""
+        SELECT requests FROM api_budget
+        WHERE provider = %s AND day = (now() AT TIME ZONE 'utc')::date
+    """, (provider,))
+    used = rows[0]["requests"] if rows else 0
+    return max(0, daily_limit - used)
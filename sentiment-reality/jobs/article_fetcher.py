@@ -0,0 +1,169 @@
+"""
+Concurrent article full-text extraction.
+
+Article pages are downloaded on a bounded thread pool through one shared
+keep-alive requests.Session, then parsed with newspaper3k. Concurrency per
+domain is capped so a batch full of one publisher's links doesn't hammer it
+(excess URLs wait in a per-domain queue, not on a worker thread), and every
+request has a connect/read timeout.
+
+Scoring jobs call prefetch() with the URLs of upcoming items, so downloads
+run ahead of (and overlap with) model inference; get() then returns the
+text, waiting only if that download hasn't finished yet.
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+
+FETCH_WORKERS = int(os.getenv("ARTICLE_FETCH_WORKERS", "8"))
+PER_DOMAIN_LIMIT = int(os.getenv("ARTICLE_FETCH_PER_DOMAIN", "2"))
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = int(os.getenv("ARTICLE_FETCH_TIMEOUT", "15"))
+# Seconds a finished download waits for get() before it is dropped
+PENDING_TTL = int(os.getenv("ARTICLE_FETCH_PENDING_TTL", "600"))
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+
+
+def make_session(pool_size: int = FETCH_WORKERS) -> requests.Session:
+    """Keep-alive session sized for pool_size concurrent downloads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def extract_article(url: str, session: requests.Session | None = None) -> dict:
+    """
+    Download and parse one article.
+
+    Returns:
+        Dict with text (empty string on failure) and status:
+        'ok' | 'empty' | 'http_<code>' | 'timeout' | 'error'
+    """
+    session = session or get_fetcher().session
+
+    try:
+        response = session.get(url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+    except requests.exceptions.Timeout:
+        return {"text": "", "status": "timeout"}
+    except requests.exceptions.RequestException:
+        return {"text": "", "status": "error"}
+
+    if response.status_code >= 400:
+        return {"text": "", "status": f"http_{response.status_code}"}
+
+    try:
+        from newspaper import Article
+
+        article = Article(url, keep_article_html=False)
+        article.download(input_html=response.text)
+        article.parse()
+        text = (article.text or "").strip()
+    except Exception:
+        return {"text": "", "status": "error"}
+
+    return {"text": text, "status": "ok" if text else "empty"}
+
+
+class ArticleFetcher:
+    """
+    Thread pool of article downloads with per-domain concurrency limits.
+
+    URLs wait in a queue per domain and are handed to the pool only while
+    their domain has a free slot, so a batch full of one publisher's links
+    never ties up the workers that other domains' downloads need. Finished
+    downloads that nobody collects with get() are dropped after pending_ttl
+    seconds, so a later get() downloads the page again instead of returning
+    a stale result.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = FETCH_WORKERS,
+        per_domain: int = PER_DOMAIN_LIMIT,
+        pending_ttl: float = PENDING_TTL,
+    ):
+        self.session = make_session(max_workers)
+        self.per_domain = per_domain
+        self.pending_ttl = pending_ttl
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+        self.pending: dict[str, Future] = {}
+        self._finished_at: dict[str, float] = {}
+        self._queued: dict[str, deque[tuple[str, Future]]] = {}
+        self._active: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _start_queued(self, domain: str) -> None:
+        """Submit domain's queued URLs while it has free slots (caller holds _lock)."""
+        queue = self._queued.get(domain)
+        while queue and self._active.get(domain, 0) < self.per_domain:
+            url, future = queue.popleft()
+            self._active[domain] = self._active.get(domain, 0) + 1
+            self.executor.submit(self._fetch, url, domain, future)
+        if queue is not None and not queue:
+            del self._queued[domain]
+
+    def _fetch(self, url: str, domain: str, future: Future) -> None:
+        try:
+            result = extract_article(url, self.session)
+        except Exception:
+            result = {"text": "", "status": "error"}
+
+        with self._lock:
+            self._active[domain] -= 1
+            if self.pending.get(url) is future:
+                self._finished_at[url] = time.monotonic()
+            self._start_queued(domain)
+        future.set_result(result)
+
+    def _evict_stale(self) -> None:
+        """Drop finished, uncollected downloads older than pending_ttl (caller holds _lock)."""
+        cutoff = time.monotonic() - self.pending_ttl
+        for url in [url for url, finished in self._finished_at.items() if finished < cutoff]:
+            del self._finished_at[url]
+            del self.pending[url]
+
+    def prefetch(self, urls: list[str]) -> None:
+        """Start downloading urls in the background (already-queued URLs are skipped)."""
+        with self._lock:
+            self._evict_stale()
+            domains = set()
+            for url in urls:
+                if url and url not in self.pending:
+                    self.pending[url] = Future()
+                    domain = urlparse(url).netloc.lower()
+                    self._queued.setdefault(domain, deque()).append((url, self.pending[url]))
+                    domains.add(domain)
+            for domain in domains:
+                self._start_queued(domain)
+
+    def get(self, url: str) -> dict:
+        """Result for url ({'text', 'status'}), downloading it now if it wasn't prefetched."""
+        self.prefetch([url])
+        with self._lock:
+            future = self.pending.pop(url)
+            self._finished_at.pop(url, None)
+        return future.result()
+
+    def fetch_many(self, urls: list[str]) -> dict[str, dict]:
+        """Download urls concurrently and return results keyed by URL."""
+        self.prefetch(urls)
+        return {url: self.get(url) for url in dict.fromkeys(urls) if url}
+
+
+@lru_cache(maxsize=1)
+def get_fetcher() -> ArticleFetcher:
+    """Process-wide fetcher (one pool and session per process)."""
+    return ArticleFetcher()
@@ -3,11 +3,15 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from db import query, execute
+from model_keys import PREFERRED_SCORE_SQL, preferred_score_params
 
-def compute_daily_aggregates(ticker: str):
+def compute_daily_aggregates(ticker: str, model_key: str | None = None):
     """
     Compute daily_agg rows from item_scores joined to items.
 
+    Scores are read under model_key (default: the active model key).
+
+    - Uses the full-text score per item, falling back to the headline tier
     - Groups by day
     - Calculates sentiment_avg, article_count, label counts
     - Upserts into daily_agg table
@@ -15,7 +19,8 @@ def compute_daily_aggregates(ticker: str):
     print(f"Computing daily aggregates for {ticker}")
 
     # Get all scored items for this ticker, grouped by day
-    rows = query("""
+    # (one score per item: full-text, else headline tier)
+    rows = query(f"""
         SELECT
             DATE(i.published_at) as date,
             AVG(s.sentiment_score) as sentiment_avg,
@@ -24,11 +29,11 @@ def compute_daily_aggregates(ticker: str):
             SUM(CASE WHEN s.sentiment_label = 'NEUTRAL' THEN 1 ELSE 0 END) as neutral_count,
             SUM(CASE WHEN s.sentiment_label = 'NEGATIVE' THEN 1 ELSE 0 END) as negative_count
         FROM items i
-        JOIN item_scores s ON i.id = s.item_id
+        JOIN LATERAL ({PREFERRED_SCORE_SQL}) s ON true
         WHERE i.ticker = %s
         GROUP BY DATE(i.published_at)
         ORDER BY date
-    """, (ticker,))
+    """, (*preferred_score_params(model_key), ticker))
 
     if not rows:
         print(f"No scored items found for {ticker}")
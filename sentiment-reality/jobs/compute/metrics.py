@@ -2,7 +2,8 @@
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from db import query, execute
+from db import query, copy_upsert
+from compute.rolling import METRICS_COLUMNS, metrics_rows
 import numpy as np
 from datetime import date, timedelta
 
@@ -52,40 +53,20 @@ def compute_metrics(ticker: str, window_days: int = 7):
         print(f"Not enough common dates for {ticker} (need {window_days}, have {len(common_dates)})")
         return 0
 
-    count = 0
-    for i in range(window_days - 1, len(common_dates)):
-        window_dates = common_dates[i - window_days + 1 : i + 1]
-        date_end = window_dates[-1]
-
-        sentiments_window = [sentiment_by_date[d] for d in window_dates]
-        returns_window = [return_by_date[d] for d in window_dates]
-
-        # Compute metrics
-        metrics = _compute_window_metrics(sentiments_window, returns_window)
-
-        # Upsert
-        execute("""
-            INSERT INTO metrics_windowed
-                (ticker, date_end, window_days, corr, directional_match,
-                 alignment_score, misalignment_days, interpretation)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (ticker, date_end, window_days) DO UPDATE SET
-                corr = EXCLUDED.corr,
-                directional_match = EXCLUDED.directional_match,
-                alignment_score = EXCLUDED.alignment_score,
-                misalignment_days = EXCLUDED.misalignment_days,
-                interpretation = EXCLUDED.interpretation
-        """, (
-            ticker,
-            date_end,
-            window_days,
-            metrics["corr"],
-            metrics["directional_match"],
-            metrics["alignment_score"],
-            metrics["misalignment_days"],
-            metrics["interpretation"],
-        ))
-        count += 1
+    # Every window end date at once (compute/rolling.py), then one bulk upsert
+    rows = metrics_rows(
+        ticker,
+        common_dates,
+        [sentiment_by_date[d] for d in common_dates],
+        [return_by_date[d] for d in common_dates],
+        window_days,
+    )
+    count = copy_upsert(
+        "metrics_windowed",
+        METRICS_COLUMNS,
+        rows,
+        conflict_columns=["ticker", "date_end", "window_days"],
+    )
 
     print(f"Computed {count} window metrics for {ticker}")
     return count
@@ -95,6 +76,9 @@ def _compute_window_metrics(sentiments: list, returns: list) -> dict:
     """
     Compute metrics for a single window.
 
+    Reference implementation; compute_metrics uses the vectorized
+    compute.rolling.rolling_metrics, which is checked against this.
+
     Formula for alignment_score:
     - 0.5 * correlation + 0.5 * directional_match
     - Clamped to [-1, 1]
@@ -0,0 +1,149 @@
+"""
+Vectorized rolling-window metrics (sentiment vs price alignment).
+
+Computes the metrics of compute.metrics._compute_window_metrics for every
+window end date at once in O(n): window sums of x, y, x², y², xy and sign
+matches come from differences of cumulative sums, so no window is sliced
+or revisited. The cumulative sums are built once and shared by every
+requested window size (rolling_metrics_multi).
+
+Inputs are centered on their overall mean before summing; variance and
+covariance are shift-invariant, and centering keeps the running sums small
+so differencing them loses little precision.
+"""
+import numpy as np
+
+# Windows whose sentiment or return std is below this get corr = 0
+MIN_STD = 0.001
+
+ALIGNED_THRESHOLD = 0.3
+MISLEADING_THRESHOLD = -0.3
+
+# metrics_windowed columns, in metrics_rows() order
+METRICS_COLUMNS = [
+    "ticker", "date_end", "window_days", "corr", "directional_match",
+    "alignment_score", "misalignment_days", "interpretation",
+]
+
+
+def _prefix_sums(sentiments, returns) -> dict[str, np.ndarray]:
+    """
+    Cumulative sums (with a leading 0) of centered x, y, x², y², xy and
+    sign matches, shared by every window size.
+    """
+    raw_x = np.asarray(sentiments, dtype=float)
+    raw_y = np.asarray(returns, dtype=float)
+    x = raw_x - raw_x.mean()
+    y = raw_y - raw_y.mean()
+    # sign(0) = 0, so a zero counts as matching only another zero
+    signs_match = (np.sign(raw_x) == np.sign(raw_y)).astype(float)
+
+    return {
+        name: np.concatenate(([0.0], np.cumsum(values)))
+        for name, values in (
+            ("x", x), ("y", y), ("xx", x * x), ("yy", y * y), ("xy", x * y),
+            ("matches", signs_match),
+        )
+    }
+
+
+def _window_sums(prefix: np.ndarray, window: int) -> np.ndarray:
+    """Sum of every length-`window` run (len(prefix) - window sums)."""
+    return prefix[window:] - prefix[:-window]
+
+
+def _empty_metrics() -> dict[str, np.ndarray | list]:
+    empty = np.empty(0)
+    return {
+        "corr": empty,
+        "directional_match": empty,
+        "alignment_score": empty,
+        "misalignment_days": np.empty(0, dtype=int),
+        "interpretation": [],
+    }
+
+
+def _metrics_from_prefix(prefix: dict[str, np.ndarray], window: int) -> dict[str, np.ndarray | list]:
+    n = len(prefix["x"]) - 1
+    if window < 1 or n < window:
+        return _empty_metrics()
+
+    mean_x = _window_sums(prefix["x"], window) / window
+    mean_y = _window_sums(prefix["y"], window) / window
+    var_x = np.maximum(_window_sums(prefix["xx"], window) / window - mean_x * mean_x, 0.0)
+    var_y = np.maximum(_window_sums(prefix["yy"], window) / window - mean_y * mean_y, 0.0)
+    cov = _window_sums(prefix["xy"], window) / window - mean_x * mean_y
+
+    std_x = np.sqrt(var_x)
+    std_y = np.sqrt(var_y)
+    defined = (std_x >= MIN_STD) & (std_y >= MIN_STD)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = np.where(defined, cov / (std_x * std_y), 0.0)
+    corr = np.clip(np.nan_to_num(corr, nan=0.0), -1.0, 1.0)
+
+    matches = np.rint(_window_sums(prefix["matches"], window)).astype(int)
+    directional_match = matches / window
+    misalignment_days = window - matches
+
+    alignment_score = np.clip(0.5 * corr + 0.5 * (directional_match * 2 - 1), -1.0, 1.0)
+
+    return {
+        "corr": np.round(corr, 4),
+        "directional_match": np.round(directional_match, 4),
+        "alignment_score": np.round(alignment_score, 4),
+        "misalignment_days": misalignment_days,
+        "interpretation": interpret(alignment_score),
+    }
+
+
+def interpret(alignment_scores: np.ndarray) -> list[str]:
+    """'Aligned' | 'Misleading' | 'Noisy' for each alignment score."""
+    return np.select(
+        [alignment_scores >= ALIGNED_THRESHOLD, alignment_scores <= MISLEADING_THRESHOLD],
+        ["Aligned", "Misleading"],
+        default="Noisy",
+    ).tolist()
+
+
+def rolling_metrics_multi(sentiments, returns, windows: list[int]) -> dict[int, dict]:
+    """rolling_metrics() for several window sizes from one set of prefix sums."""
+    if not len(sentiments):
+        return {window: _empty_metrics() for window in windows}
+    prefix = _prefix_sums(sentiments, returns)
+    return {window: _metrics_from_prefix(prefix, window) for window in dict.fromkeys(windows)}
+
+
+def rolling_metrics(sentiments, returns, window: int) -> dict[str, np.ndarray | list]:
+    """
+    Metrics for every window of `window` consecutive points.
+
+    Element i describes the window ending at index i + window - 1. Returns
+    dict of corr, directional_match, alignment_score (float arrays, rounded
+    to 4 places), misalignment_days (int array) and interpretation (list);
+    all empty if there are fewer than `window` points.
+    """
+    return rolling_metrics_multi(sentiments, returns, [window])[window]
+
+
+def metrics_rows(ticker: str, dates: list, sentiments, returns, windows: int | list[int]) -> list[tuple]:
+    """
+    metrics_windowed rows for every window end date of each window size:
+    (ticker, date_end, window_days, corr, directional_match,
+     alignment_score, misalignment_days, interpretation)
+    """
+    windows = [windows] if isinstance(windows, int) else windows
+    rows = []
+    for window, metrics in rolling_metrics_multi(sentiments, returns, windows).items():
+        count = len(metrics["interpretation"])
+        rows.extend(zip(
+            [ticker] * count,
+            dates[window - 1:],
+            [window] * count,
+            metrics["corr"].tolist(),
+            metrics["directional_match"].tolist(),
+            metrics["alignment_score"].tolist(),
+            metrics["misalignment_days"].tolist(),
+            metrics["interpretation"],
+        ))
+    return rows
+
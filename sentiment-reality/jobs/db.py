@@ -1,8 +1,9 @@
 """Database helper for jobs."""
+import io
 import os
 from pathlib import Path
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values as _execute_values
 from contextlib import contextmanager
 from dotenv import load_dotenv
 
@@ -111,3 +112,116 @@ def execute_many(sql: str, params_list: list[tuple]) -> int:
 
 # Alias for compatibility with spec
 executemany = execute_many
+
+
+def execute_values(
+    sql: str,
+    rows: list[tuple],
+    page_size: int = 500,
+    fetch: bool = False,
+    conn=None,
+):
+    """
+    Execute a multi-row INSERT in pages of `page_size` rows on one connection.
+
+    `sql` must contain a single `VALUES %s` placeholder. Returns the affected
+    row count, or the RETURNING rows as dicts when fetch=True.
+
+    If `conn` is given the statement runs inside the caller's transaction and
+    is not committed here.
+    """
+    if not rows:
+        return [] if fetch else 0
+
+    if conn is None:
+        with transaction() as own_conn:
+            return execute_values(sql, rows, page_size=page_size, fetch=fetch, conn=own_conn)
+
+    total = 0
+    returned = []
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        # Page manually so rowcount can be summed across pages
+        for start in range(0, len(rows), page_size):
+            page = rows[start:start + page_size]
+            result = _execute_values(cur, sql, page, page_size=len(page), fetch=fetch)
+            if fetch:
+                returned.extend(dict(row) for row in result)
+            else:
+                total += cur.rowcount
+    return returned if fetch else total
+
+
+def _copy_value(value) -> str:
+    """One value in COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_upsert(
+    table: str,
+    columns: list[str],
+    rows: list[tuple],
+    conflict_columns: list[str],
+    update_columns: list[str] | None = None,
+    conn=None,
+) -> int:
+    """
+    Bulk upsert rows: COPY into a temp table, then merge with one
+    INSERT ... SELECT ... ON CONFLICT statement, in one transaction.
+
+    Rows must be unique on conflict_columns. Columns not in update_columns
+    (default: every column outside conflict_columns) keep their stored
+    values on conflict; an empty list means DO NOTHING. Returns the number
+    of rows inserted or updated.
+
+    If `conn` is given the load runs inside the caller's transaction and is
+    not committed here.
+    """
+    if not rows:
+        return 0
+
+    if conn is None:
+        with transaction() as own_conn:
+            return copy_upsert(table, columns, rows, conflict_columns, update_columns, conn=own_conn)
+
+    if update_columns is None:
+        update_columns = [c for c in columns if c not in conflict_columns]
+    column_list = ", ".join(columns)
+    staging = f"_copy_{table}"
+
+    if update_columns:
+        on_conflict = "DO UPDATE SET " + ", ".join(f"{c} = EXCLUDED.{c}" for c in update_columns)
+    else:
+        on_conflict = "DO NOTHING"
+
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(v) for v in row))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    with conn.cursor() as cur:
+        # Column types only (no constraints); dropped after the merge, since
+        # the next call in this transaction may load other columns
+        cur.execute(f"""
+            CREATE TEMP TABLE {staging} AS
+            SELECT {column_list} FROM {table} WITH NO DATA
+        """)
+        cur.copy_expert(f"COPY {staging} ({column_list}) FROM STDIN", buffer)
+        cur.execute(f"""
+            INSERT INTO {table} ({column_list})
+            SELECT {column_list} FROM {staging}
+            ON CONFLICT ({", ".join(conflict_columns)}) {on_conflict}
+        """)
+        count = cur.rowcount
+        cur.execute(f"DROP TABLE {staging}")
+    return count
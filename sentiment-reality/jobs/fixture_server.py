@@ -0,0 +1,352 @@
+"""
+Local stand-in for NewsAPI, publisher sites and the price history API.
+
+Serves deterministic (or recorded) data with configurable latency and
+error injection, so ingestion throughput, concurrency and caching changes
+can be benchmarked offline and reproducibly.
+
+Routes:
+  /v2/everything?q=TSLA&from=...&to=...&page=1&pageSize=100   NewsAPI-format search
+  /articles/<TICKER>/<n>                               Article HTML page
+  /v1/history?symbols=TSLA,NVDA&start=...&end=...      Daily bars (or period=5d)
+  /stats                                               Request counts per route
+
+Point the jobs at it (from jobs/, in another shell):
+  python fixture_server.py --port 8765 --latency 0.2 --error-rate 0.05
+  NEWSAPI_URL=http://127.0.0.1:8765/v2/everything NEWSAPI_KEY=test \\
+  PRICES_BASE_URL=http://127.0.0.1:8765 python run_local.py daily
+
+Options:
+  --host HOST              Bind address (default: 127.0.0.1)
+  --port N                 Port (default: 8765)
+  --latency S              Seconds added to every response (default: 0)
+  --jitter S               Extra random latency up to S seconds (default: 0)
+  --error-rate P           Fraction of requests answered with a 5xx (default: 0)
+  --slow-rate P            Fraction of requests stalled for --slow-seconds (default: 0)
+  --slow-seconds S         Stall length, past client timeouts (default: 30)
+  --articles N             Generated articles per ticker (default: 200)
+  --max-results N          Answer pages past the first N results with
+                           maximumResultsReached, like the NewsAPI developer
+                           plan (default: 0 = no cap)
+  --news PATH              Serve recorded articles (JSONL, as written by
+                           `providers/news.py record`) instead of generated ones
+  --seed N                 Random seed for latency/error injection (default: 0)
+"""
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_PORT = 8765
+
+WORDS = [
+    "shares", "rose", "fell", "after", "earnings", "beat", "missed", "analysts",
+    "upgraded", "downgraded", "guidance", "revenue", "growth", "slowed", "record",
+    "deliveries", "margins", "pressure", "rallied", "investors", "outlook", "raised",
+    "cut", "price", "target", "quarterly", "report", "demand", "supply", "costs",
+]
+
+# First date of generated price histories
+PRICE_EPOCH = date(2000, 1, 3)
+
+
+class FixtureConfig:
+    """Server options plus the article set and request counters."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_seconds: float = 30.0,
+        articles: int = 200,
+        max_results: int = 0,
+        news_path: str | None = None,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_seconds = slow_seconds
+        self.articles_per_ticker = articles
+        self.max_results = max_results
+        self.started = datetime.now(timezone.utc).replace(microsecond=0)
+        self.recorded = _load_recorded(news_path) if news_path else None
+        self.rng = random.Random(seed)
+        self.stats = Counter()
+        self.lock = threading.Lock()
+
+    def inject(self) -> str | None:
+        """Apply latency; returns 'error' or 'slow' when a fault is injected."""
+        with self.lock:
+            roll = self.rng.random()
+            delay = self.latency + self.rng.random() * self.jitter
+        time.sleep(delay)
+        if roll < self.error_rate:
+            return "error"
+        if roll < self.error_rate + self.slow_rate:
+            time.sleep(self.slow_seconds)
+            return "slow"
+        return None
+
+
+def _load_recorded(path: str) -> dict[str, list[dict]]:
+    """Recorded articles by ticker, newest first."""
+    by_ticker: dict[str, list[dict]] = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                ticker = (record.get("stock_symbol") or record.get("ticker") or "").upper()
+                by_ticker.setdefault(ticker, []).append(record)
+    for records in by_ticker.values():
+        records.sort(key=lambda r: r.get("published_at", ""), reverse=True)
+    return by_ticker
+
+
+def _sentence(rng: random.Random, ticker: str, n: int) -> str:
+    words = [rng.choice(WORDS) for _ in range(n)]
+    words.insert(rng.randrange(len(words)), ticker)
+    return " ".join(words).capitalize() + "."
+
+
+def news_articles(config: FixtureConfig, ticker: str, base_url: str) -> list[dict]:
+    """NewsAPI-format articles for ticker, newest first (every 30 minutes back from start)."""
+    if config.recorded is not None:
+        records = config.recorded.get(ticker, []) + config.recorded.get("", [])
+        count = len(records)
+    else:
+        records = None
+        count = config.articles_per_ticker
+
+    articles = []
+    for n in range(count):
+        rng = random.Random(f"{ticker}:{n}")
+        published = config.started - timedelta(minutes=30 * n)
+        title = _sentence(rng, ticker, 8)
+        description = _sentence(rng, ticker, 16)
+        source = rng.choice(["Reuters", "Bloomberg", "MarketWatch", "Yahoo Finance"])
+        if records is not None:
+            record = records[n]
+            title = record.get("headline") or record.get("title") or title
+            description = record.get("snippet") or description
+            source = record.get("source") or source
+        articles.append({
+            "source": {"id": None, "name": source},
+            "author": None,
+            "title": title,
+            "description": description,
+            "url": f"{base_url}/articles/{ticker}/{n}",
+            "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "content": description,
+        })
+    return articles
+
+
+def article_html(ticker: str, n: int) -> str:
+    """Deterministic article page that newspaper3k can extract."""
+    rng = random.Random(f"{ticker}:{n}")
+    title = _sentence(rng, ticker, 8)
+    paragraphs = "".join(
+        f"<p>{' '.join(_sentence(rng, ticker, 14) for _ in range(3))}</p>"
+        for _ in range(8)
+    )
+    return (
+        f"<html><head><title>{title}</title></head><body>"
+        f"<article><h1>{title}</h1>{paragraphs}</article></body></html>"
+    )
+
+
+@lru_cache(maxsize=256)
+def _price_series(ticker: str, last_day: date) -> tuple[list[date], list[float]]:
+    """Random-walk closes on weekdays from PRICE_EPOCH to last_day (same for every request)."""
+    rng = random.Random(f"prices:{ticker}")
+    days, closes = [], []
+    close = 20 + rng.random() * 180
+    day = PRICE_EPOCH
+    while day <= last_day:
+        if day.weekday() < 5:
+            close = max(1.0, close * (1 + rng.gauss(0.0004, 0.02)))
+            days.append(day)
+            closes.append(round(close, 4))
+        day += timedelta(days=1)
+    return days, closes
+
+
+def price_history(ticker: str, start: date, end: date) -> dict:
+    """Daily bars in [start, end) as columns (yfinance column names)."""
+    days, closes = _price_series(ticker, date.today())
+    rng = random.Random(f"bars:{ticker}")
+    history = {"date": [], "Open": [], "High": [], "Low": [], "Close": [], "Volume": []}
+    for day, close in zip(days, closes):
+        if start <= day < end:
+            spread = close * 0.01 * (1 + rng.random())
+            history["date"].append(day.isoformat())
+            history["Open"].append(round(close - spread / 2, 4))
+            history["High"].append(round(close + spread, 4))
+            history["Low"].append(round(close - spread, 4))
+            history["Close"].append(close)
+            history["Volume"].append(rng.randrange(1_000_000, 50_000_000))
+    return history
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Routes requests to the fixture data; `server.config` holds the options."""
+
+    def do_GET(self):
+        config: FixtureConfig = self.server.config
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p]
+
+        if parts == ["stats"]:
+            return self._send_json(200, dict(config.stats))
+
+        route = parts[0] if parts else ""
+        with config.lock:
+            config.stats[route] += 1
+
+        fault = config.inject()
+        if fault == "error":
+            with config.lock:
+                config.stats["errors"] += 1
+            if route == "v2":
+                return self._send_json(500, {
+                    "status": "error", "code": "unexpectedError", "message": "Injected error",
+                })
+            return self._send(503, "text/plain", b"Injected error")
+
+        if parts == ["v2", "everything"]:
+            return self._news(config, params)
+        if len(parts) == 3 and parts[0] == "articles" and parts[2].isdigit():
+            body = article_html(parts[1].upper(), int(parts[2])).encode()
+            return self._send(200, "text/html; charset=utf-8", body)
+        if parts == ["v1", "history"]:
+            return self._history(params)
+        return self._send(404, "text/plain", b"Not found")
+
+    def _news(self, config: FixtureConfig, params: dict):
+        if not params.get("apiKey"):
+            return self._send_json(401, {
+                "status": "error", "code": "apiKeyMissing", "message": "Your API key is missing.",
+            })
+
+        ticker = params.get("q", "").upper()
+        articles = news_articles(config, ticker, f"http://{self.headers['Host']}")
+        if params.get("from"):
+            since = params["from"].rstrip("Z")
+            articles = [a for a in articles if a["publishedAt"].rstrip("Z") >= since]
+        if params.get("to"):
+            until = params["to"].rstrip("Z")
+            articles = [a for a in articles if a["publishedAt"].rstrip("Z") <= until]
+
+        page_size = min(int(params.get("pageSize", 100)), 100)
+        page = int(params.get("page", 1))
+        if config.max_results and page * page_size > config.max_results:
+            return self._send_json(426, {
+                "status": "error", "code": "maximumResultsReached",
+                "message": f"You have requested too many results. Developer accounts are "
+                           f"limited to a max of {config.max_results} results.",
+            })
+        page_articles = articles[(page - 1) * page_size:page * page_size]
+        return self._send_json(200, {
+            "status": "ok",
+            "totalResults": len(articles),
+            "articles": page_articles,
+        })
+
+    def _history(self, params: dict):
+        today = date.today()
+        end = date.fromisoformat(params["end"]) if params.get("end") else today + timedelta(days=1)
+        if params.get("start"):
+            start = date.fromisoformat(params["start"])
+        else:
+            period_days = int(params.get("period", "5d").rstrip("d"))
+            # Calendar days covering the last `period` trading days
+            start = end - timedelta(days=period_days * 7 // 5 + 3)
+
+        symbols = [s.upper() for s in params.get("symbols", "").split(",") if s]
+        history = {symbol: price_history(symbol, start, end) for symbol in symbols}
+        if params.get("period"):
+            period_days = int(params["period"].rstrip("d"))
+            history = {
+                symbol: {k: v[-period_days:] for k, v in columns.items()}
+                for symbol, columns in history.items()
+            }
+        return self._send_json(200, history)
+
+    def _send_json(self, status: int, payload) -> None:
+        self._send(status, "application/json", json.dumps(payload).encode())
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client gave up (e.g. timed out on an injected stall)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host: str = "127.0.0.1", port: int = DEFAULT_PORT, **options) -> ThreadingHTTPServer:
+    """Fixture server (not started); options are FixtureConfig arguments."""
+    server = ThreadingHTTPServer((host, port), FixtureHandler)
+    server.daemon_threads = True
+    server.config = FixtureConfig(**options)
+    return server
+
+
+def start_in_thread(host: str = "127.0.0.1", port: int = 0, **options) -> ThreadingHTTPServer:
+    """Serve from a daemon thread (port 0 = any free port); returns the server."""
+    server = make_server(host, port, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    if "-h" in args or "--help" in args:
+        print(__doc__)
+        sys.exit(0)
+
+    def option(name: str, default=None):
+        if name in args:
+            return args[args.index(name) + 1]
+        return default
+
+    host = option("--host", "127.0.0.1")
+    port = int(option("--port", DEFAULT_PORT))
+    server = make_server(
+        host,
+        port,
+        latency=float(option("--latency", 0)),
+        jitter=float(option("--jitter", 0)),
+        error_rate=float(option("--error-rate", 0)),
+        slow_rate=float(option("--slow-rate", 0)),
+        slow_seconds=float(option("--slow-seconds", 30)),
+        articles=int(option("--articles", 200)),
+        max_results=int(option("--max-results", 0)),
+        news_path=option("--news"),
+        seed=int(option("--seed", 0)),
+    )
+
+    print(f"Fixture server on http://{host}:{port}")
+    print(f"  NEWSAPI_URL=http://{host}:{port}/v2/everything")
+    print(f"  PRICES_BASE_URL=http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
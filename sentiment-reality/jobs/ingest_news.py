@@ -1,17 +1,24 @@
 import requests
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from typing import List, Dict, Any
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-from newspaper import Article
 import yfinance as yf
 import psycopg2
+from providers.price_lookup import PriceLookup
+from api_budget import reserve_request
 
 # Load .env from project root (one level up from jobs/)
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(env_path)
 
+# NewsAPI pagination and request budget (NEWSAPI_URL can point at fixture_server.py)
+NEWSAPI_URL = os.getenv('NEWSAPI_URL', 'https://newsapi.org/v2/everything')
+NEWSAPI_PAGE_SIZE = 100  # NewsAPI maximum
+NEWSAPI_MAX_REQUESTS_PER_RUN = int(os.getenv('NEWSAPI_MAX_REQUESTS_PER_RUN', '5'))
+NEWSAPI_DAILY_BUDGET = int(os.getenv('NEWSAPI_DAILY_BUDGET', '100'))
+
 
 def get_stock_price_data(stock_symbol: str) -> Dict[str, Any]:
     """
@@ -70,6 +77,41 @@ def get_stock_price_data(stock_symbol: str) -> Dict[str, Any]:
         }
 
 
+def _published_date(published_at: str) -> date | None:
+    """Date part of a NewsAPI publishedAt timestamp, or None if missing/invalid."""
+    try:
+        return date.fromisoformat(published_at.split('T')[0])
+    except ValueError:
+        return None
+
+
+def annotate_prices(stock_symbol: str, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Add price, price_timestamp, price_change and price_direction to article dicts in place.
+
+    One price history load covers the whole batch; every article is then
+    annotated from memory (see providers/price_lookup.py).
+    """
+    prices = PriceLookup(stock_symbol)
+    published_dates = [_published_date(a.get('published_at') or '') for a in articles]
+    known_dates = [d for d in published_dates if d]
+    if known_dates:
+        prices.load(min(known_dates), max(known_dates))
+
+    for article, published_date in zip(articles, published_dates):
+        if published_date:
+            price_info = prices.annotate(published_date)
+        else:
+            price_info = {'price': None, 'price_change': None, 'price_direction': 'unknown'}
+
+        article['price'] = price_info['price']
+        article['price_timestamp'] = article.get('published_at')
+        article['price_change'] = price_info['price_change']
+        article['price_direction'] = price_info['price_direction']
+
+    return articles
+
+
 def get_news_data(stock_symbol: str, hours: int = 168) -> List[Dict[str, Any]]:
     """
     Fetch article information from NewsAPI for a given stock symbol from the specified timeframe.
@@ -84,6 +126,7 @@ def get_news_data(stock_symbol: str, hours: int = 168) -> List[Dict[str, Any]]:
             - headline (str): Article title/headline
             - source (str): News source name
             - published_at (str): ISO format publication date
+            - snippet (str): Article description
             - stock_symbol (str): The stock symbol searched
             - price (float): Stock price at time of article publication
             - price_timestamp (str): ISO format timestamp of price
@@ -93,106 +136,148 @@ def get_news_data(stock_symbol: str, hours: int = 168) -> List[Dict[str, Any]]:
     Note:
         Requires NEWSAPI_KEY environment variable to be set.
         Get a free API key from https://newsapi.org/
+        See fetch_news_pages() for pagination and request budget details.
+    """
+    return fetch_news_pages(stock_symbol, hours=hours)['articles']
+
+
+def fetch_news_pages(
+    stock_symbol: str,
+    hours: int = 168,
+    since: datetime | None = None,
+    max_requests: int | None = None,
+    until: datetime | None = None,
+) -> Dict[str, Any]:
+    """
+    Fetch every page of NewsAPI results for a stock symbol, within a request budget.
+
+    Pages are requested until the results are exhausted, this run's
+    max_requests is used up, or the shared daily budget (api_budget ledger,
+    NEWSAPI_DAILY_BUDGET) is spent. Results come newest first; when the plan's
+    result cap is hit (maximumResultsReached), paging restarts at page 1 with
+    `to` set to the oldest article read so far.
+    
+    Args:
+        stock_symbol (str): Stock ticker symbol (e.g., 'AAPL', 'GOOGL')
+        hours (int): Number of hours to look back for articles (default: 168 = 7 days)
+        since (datetime): Watermark; only request articles published at or after
+            it (if later than the lookback window start)
+        max_requests (int): Max NewsAPI requests for this call
+            (default: NEWSAPI_MAX_REQUESTS_PER_RUN)
+        until (datetime): Only request articles published at or before it
+            (resumes a fetch that stopped early; see ingest_to_db)
+    
+    Returns:
+        Dict containing:
+            - articles (list): Article dicts as described in get_news_data()
+            - complete (bool): True if every page was read
+            - requests (int): NewsAPI requests made
+            - newest_published_at (str): Latest publishedAt seen, or None
+            - oldest_published_at (str): Earliest publishedAt seen, or None
     """
+    result = {
+        'articles': [], 'complete': False, 'requests': 0,
+        'newest_published_at': None, 'oldest_published_at': None,
+    }
+
     # Get API key from environment
     api_key = os.getenv('NEWSAPI_KEY')
     if not api_key:
         print("Error: NEWSAPI_KEY environment variable not set")
         print("Get a free API key from https://newsapi.org/")
-        return []
-    
-    # NewsAPI endpoint
-    api_url = "https://newsapi.org/v2/everything"
+        return result
     
-    # Calculate the date threshold based on hours parameter
-    timeframe_start = (datetime.now(timezone.utc) - timedelta(hours=hours)).date().isoformat()
+    max_requests = max_requests or NEWSAPI_MAX_REQUESTS_PER_RUN
+
+    # Start of the window: lookback hours, or the watermark if more recent
+    timeframe_start = datetime.now(timezone.utc) - timedelta(hours=hours)
+    if since and since > timeframe_start:
+        timeframe_start = since
     
-    articles_info = []
+    articles = []
     
     try:
         # Parameters for the API request
         params = {
             'q': stock_symbol,  # Search for the stock symbol
-            'from': timeframe_start,  # From specified hours ago
+            'from': timeframe_start.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S'),
             'sortBy': 'publishedAt',  # Sort by published date
             'language': 'en',  # English only
+            'pageSize': NEWSAPI_PAGE_SIZE,
             'apiKey': api_key
         }
+        if until:
+            params['to'] = until.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
         
-        # Make the request
-        response = requests.get(api_url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        # Parse the response
-        data = response.json()
-        
-        # Check if the request was successful
-        if data.get('status') != 'ok':
-            print(f"Error from NewsAPI: {data.get('message', 'Unknown error')}")
-            return []
+        page = 1
+        while result['requests'] < max_requests:
+            if not reserve_request('newsapi', NEWSAPI_DAILY_BUDGET):
+                print(f"NewsAPI daily budget ({NEWSAPI_DAILY_BUDGET} requests) spent, stopping at page {page}")
+                break
+
+            # Make the request
+            params['page'] = page
+            response = requests.get(NEWSAPI_URL, params=params, timeout=10)
+            result['requests'] += 1
+            
+            # Parse the response (errors also come back as JSON with a code)
+            data = response.json()
+            
+            # Result cap (page * pageSize past the plan limit): continue
+            # below the oldest article read so far
+            oldest = min((a['publishedAt'] for a in articles if a.get('publishedAt')), default='').rstrip('Z')
+            if data.get('code') == 'maximumResultsReached' and oldest and oldest != params.get('to'):
+                params['to'] = oldest
+                page = 1
+                continue
+
+            # Check if the request was successful
+            if data.get('status') != 'ok':
+                print(f"Error from NewsAPI: {data.get('message', 'Unknown error')}")
+                break
+            
+            page_articles = data.get('articles', [])
+            articles.extend(page_articles)
+
+            if not page_articles or page * NEWSAPI_PAGE_SIZE >= data.get('totalResults', 0):
+                result['complete'] = True
+                break
+            page += 1
         
         # Extract article information
-        articles = data.get('articles', [])
         for article in articles:
-            article_url = article.get('url')
-            if article_url:
-                published_at = article.get('publishedAt', '')
-                
-                # Extract date from published_at and get price for that date
-                try:
-                    published_date = published_at.split('T')[0] if published_at else ''
-                    ticker = yf.Ticker(stock_symbol)
-                    df = ticker.history(start=published_date, end=(datetime.fromisoformat(published_date) + timedelta(days=1)).strftime("%Y-%m-%d"))
-                    
-                    price = None
-                    price_change = None
-                    price_direction = 'unknown'
-                    
-                    if not df.empty:
-                        row = df.iloc[0]
-                        price = round(float(row['Close']), 2)
-                        
-                        # Get previous close for price change if available
-                        prev_df = ticker.history(start=(datetime.fromisoformat(published_date) - timedelta(days=5)).strftime("%Y-%m-%d"), end=published_date)
-                        if len(prev_df) > 1:
-                            prev_close = float(prev_df.iloc[-2]['Close'])
-                            price_change = round(price - prev_close, 2)
-                            if price_change > 0:
-                                price_direction = 'up'
-                            elif price_change < 0:
-                                price_direction = 'down'
-                            else:
-                                price_direction = 'neutral'
-                except Exception as e:
-                    print(f"Error fetching price for {stock_symbol} on {published_date}: {e}")
-                    price = None
-                    price_change = None
-                    price_direction = 'unknown'
-                
-                article_info = {
-                    'url': article_url,
+            if article.get('url'):
+                result['articles'].append({
+                    'url': article.get('url'),
                     'headline': article.get('title', ''),
                     'source': article.get('source', {}).get('name', 'Unknown'),
-                    'published_at': published_at,
+                    'published_at': article.get('publishedAt', ''),
+                    'snippet': article.get('description') or '',
                     'stock_symbol': stock_symbol,
-                    'price': price,
-                    'price_timestamp': published_at,
-                    'price_change': price_change,
-                    'price_direction': price_direction
-                }
-                articles_info.append(article_info)
+                })
+
+        annotate_prices(stock_symbol, result['articles'])
+
+        published = [a['published_at'] for a in result['articles'] if a['published_at']]
+        result['newest_published_at'] = max(published) if published else None
+        result['oldest_published_at'] = min(published) if published else None
     
     except requests.exceptions.RequestException as e:
         print(f"Error fetching articles from NewsAPI: {e}")
+        result['complete'] = False
     except Exception as e:
         print(f"Error processing NewsAPI response: {e}")
+        result['complete'] = False
     
-    return articles_info
+    return result
 
 
 def get_article_text(url: str) -> str:
     """
     Extract the article text content from a given URL using newspaper3k.
+
+    Downloads go through the shared keep-alive session and per-domain limits
+    of article_fetcher; use get_fetcher().prefetch() to fetch many URLs at once.
     
     Args:
         url (str): The URL of the article to extract text from
@@ -200,23 +285,9 @@ def get_article_text(url: str) -> str:
     Returns:
         str: The article text content as plain text, or empty string if extraction fails
     """
-    try:
-        # Create an Article object from newspaper3k
-        article = Article(url, keep_article_html=False)
-        
-        # Download the article
-        article.download()
-        
-        # Parse the article content
-        article.parse()
-        
-        # Return the extracted text
-        text = article.text
-        
-        return text if text else ""
-    
-    except Exception:
-        return ""
+    from article_fetcher import get_fetcher
+
+    return get_fetcher().get(url)["text"]
 
 
 def get_daily_metrics(symbol: str, current_day: str, previous_day: str) -> dict:
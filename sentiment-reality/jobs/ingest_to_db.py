@@ -2,89 +2,120 @@
 Ingest news data into database.
 
 Functions:
-- ingest_news_to_db(): Fetch and store article metadata with stock price data
+- ingest_news_to_db(): Fetch articles from the news providers and store them
+- insert_articles(): Bulk, deduplicating insert of fetched articles
 - Query helpers: get_article_by_url(), get_articles_by_ticker(), etc.
 """
 import sys
-from ingest_news import get_news_data, get_article_text
-from db import execute, query
+from providers.news import NEWS_PROVIDERS, fetch_news
+from db import execute, execute_values, query
+from model_keys import get_active_model_key
 
 
-def ingest_news_to_db(stock_symbol: str, hours: int = 168) -> dict:
+def ingest_news_to_db(
+    stock_symbol: str,
+    hours: int = 168,
+    max_requests: int = None,
+    providers: list[str] = None,
+) -> dict:
     """
     Fetch and store article metadata with stock price data.
+
+    Articles are fetched from each news provider (NEWS_PROVIDERS by default)
+    and stored together; an article found by several providers, or already
+    stored from another provider in an earlier run, is stored once. NewsAPI
+    only requests articles newer than the ticker's watermark
+    (news_fetch_state), which advances after a complete fetch is stored. A
+    NewsAPI fetch that stops early (request budget, result cap) is resumed
+    on the next run below the oldest article it read.
     
     Returns:
         {
             'total_articles': int,
             'inserted_count': int,
             'skipped_count': int,
+            'requests': int,
+            'complete': bool,
+            'providers': dict[str, int],  # articles found per provider
             'errors': list[str]
         }
     """
-    print(f"\n📥 Fetching news for {stock_symbol} (last {hours}h)...")
+    providers = providers or NEWS_PROVIDERS
+    since, until = get_news_window(stock_symbol) if "newsapi" in providers else (None, None)
+    since_msg = f", since {since.isoformat()}" if since else ""
+    if until:
+        since_msg += f", resuming before {until.isoformat()}"
+    print(f"\n📥 Fetching news for {stock_symbol} from {', '.join(providers)} "
+          f"(last {hours}h{since_msg})...")
     
-    articles = get_news_data(stock_symbol, hours=hours)
-    total = len(articles)
-    print(f"Found {total} articles\n")
+    fetches = {}
+    errors = []
+    for provider in providers:
+        try:
+            fetches[provider] = fetch_news(
+                provider,
+                stock_symbol,
+                hours,
+                since=since if provider == "newsapi" else None,
+                max_requests=max_requests,
+                until=until if provider == "newsapi" else None,
+            )
+        except Exception as e:
+            error_msg = f"{provider}: {str(e)[:200]}"
+            errors.append(error_msg)
+            print(f"  ❌ ERROR: {error_msg}")
     
-    if not articles:
-        return {
-            'total_articles': 0,
-            'inserted_count': 0,
-            'skipped_count': 0,
-            'errors': []
-        }
+    # First provider wins when several return the same URL
+    by_url = {}
+    for fetched in fetches.values():
+        for article in fetched['articles']:
+            by_url.setdefault(article['url'], article)
+    articles = list(by_url.values())
+    
+    total = len(articles)
+    requests_made = sum(f['requests'] for f in fetches.values())
+    complete = not errors and all(f['complete'] for f in fetches.values())
+    per_provider = {name: len(f['articles']) for name, f in fetches.items()}
+    print(f"Found {total} articles in {requests_made} requests {per_provider}"
+          f"{'' if complete else ' (incomplete)'}\n")
     
     inserted = 0
     skipped = 0
-    errors = []
+    stored = True
     
-    for i, article in enumerate(articles, 1):
+    if articles:
         try:
-            # Check if URL already exists
-            existing = query(
-                "SELECT id FROM items WHERE url = %s",
-                (article['url'],)
-            )
-            
-            if existing:
-                skipped += 1
-                print(f"  [{i}/{total}] ⏭️  SKIPPED (duplicate): {article['headline'][:60]}...")
-                continue
-            
-            # Insert article metadata with price data
-            execute("""
-                INSERT INTO items 
-                (ticker, source, published_at, title, url, snippet,
-                 current_price, price_timestamp, price_change, price_direction, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, now())
-                ON CONFLICT (source, url) DO NOTHING
-            """, (
-                stock_symbol.upper(),
-                article.get('source', 'Unknown'),
-                article.get('published_at'),
-                article.get('headline', 'No title'),
-                article['url'],
-                article.get('snippet', ''),
-                article.get('price'),
-                article.get('price_timestamp'),
-                article.get('price_change'),
-                article.get('price_direction')
-            ))
-            
-            inserted += 1
-            print(f"  [{i}/{total}] ✓ INSERTED: {article['headline'][:60]}...")
-            
+            inserted_keys = insert_articles(stock_symbol, articles)
         except Exception as e:
             error_msg = str(e)[:200]
             errors.append(error_msg)
-            print(f"  [{i}/{total}] ❌ ERROR: {error_msg}")
+            print(f"  ❌ ERROR: {error_msg}")
+            inserted_keys = None
+            stored = False
+        
+        if inserted_keys is not None:
+            for i, article in enumerate(articles, 1):
+                key = (article.get('source', 'Unknown'), article['url'])
+                if key in inserted_keys:
+                    # Count an article repeated within the batch as inserted once
+                    inserted_keys.discard(key)
+                    inserted += 1
+                    print(f"  [{i}/{total}] ✓ INSERTED: {article['headline'][:60]}...")
+                else:
+                    skipped += 1
+                    print(f"  [{i}/{total}] ⏭️  SKIPPED (duplicate): {article['headline'][:60]}...")
+    
+    # Other providers' failures don't hold back the NewsAPI watermark
+    if "newsapi" in fetches and stored:
+        update_news_fetch_state(stock_symbol, fetches["newsapi"], since)
     
     result = {
         'total_articles': total,
         'inserted_count': inserted,
         'skipped_count': skipped,
+        'requests': requests_made,
+        'complete': complete,
+        'providers': per_provider,
         'errors': errors
     }
     
@@ -95,6 +126,118 @@ def ingest_news_to_db(stock_symbol: str, hours: int = 168) -> dict:
     return result
 
 
+def insert_articles(stock_symbol: str, articles: list[dict]) -> set[tuple[str, str]]:
+    """
+    Insert articles in one multi-row statement, skipping ones already stored.
+
+    URLs already in items are skipped whatever their source (providers name
+    the same publisher differently); duplicates within the batch are dropped
+    by ON CONFLICT (source, url) DO NOTHING.
+
+    Returns:
+        (source, url) of the rows actually inserted
+    """
+    urls = [article['url'] for article in articles]
+    existing = {
+        row['url'] for row in query("SELECT url FROM items WHERE url = ANY(%s)", (urls,))
+    }
+    articles = [article for article in articles if article['url'] not in existing]
+    if not articles:
+        return set()
+
+    rows = [
+        (
+            stock_symbol.upper(),
+            article.get('source', 'Unknown'),
+            article.get('source_id'),
+            article.get('published_at'),
+            article.get('headline', 'No title'),
+            article['url'],
+            article.get('snippet', ''),
+            article.get('price'),
+            article.get('price_timestamp'),
+            article.get('price_change'),
+            article.get('price_direction'),
+        )
+        for article in articles
+    ]
+
+    returned = execute_values("""
+        INSERT INTO items
+        (ticker, source, source_id, published_at, title, url, snippet,
+         current_price, price_timestamp, price_change, price_direction)
+        VALUES %s
+        ON CONFLICT (source, url) DO NOTHING
+        RETURNING source, url
+    """, rows, fetch=True)
+
+    return {(row['source'], row['url']) for row in returned}
+
+
+def get_news_window(stock_symbol: str) -> tuple:
+    """
+    (since, until) for the ticker's next NewsAPI fetch.
+
+    since is the newest published_at from the last complete fetch; tickers
+    without fetch state start from their newest stored item (None = full
+    lookback window). until is set while an earlier fetch that stopped early
+    is being resumed: the oldest published_at it read, so the next fetch
+    covers the gap between the watermark and the pages already read.
+    Returns (None, None) if the DB can't be read.
+    """
+    try:
+        state = query(
+            "SELECT watermark, backfill_to FROM news_fetch_state WHERE ticker = %s",
+            (stock_symbol.upper(),)
+        )
+        if state:
+            return state[0]['watermark'], state[0]['backfill_to']
+        rows = query(
+            "SELECT MAX(published_at) AS watermark FROM items WHERE ticker = %s",
+            (stock_symbol.upper(),)
+        )
+    except Exception as e:
+        print(f"Could not read news watermark for {stock_symbol}: {e}")
+        return None, None
+    return (rows[0]['watermark'] if rows else None), None
+
+
+def update_news_fetch_state(stock_symbol: str, fetched: dict, since=None) -> None:
+    """
+    Record a fetch.
+
+    Complete: the watermark advances to the newest article of the fetch, or
+    of the fetch being resumed (pending_watermark), and the cursor clears.
+    Stopped early: the watermark stays at `since`; backfill_to moves down to
+    the oldest article read, so the next run continues from there instead
+    of re-reading the same newest pages.
+    """
+    complete = fetched['complete']
+    watermark = fetched['newest_published_at'] if complete else since
+    backfill_to = None if complete else fetched.get('oldest_published_at')
+    pending = None if complete else fetched['newest_published_at']
+    try:
+        execute("""
+            INSERT INTO news_fetch_state
+                (ticker, watermark, backfill_to, pending_watermark, last_requests, last_complete)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (ticker) DO UPDATE SET
+                watermark = CASE WHEN EXCLUDED.last_complete
+                    THEN GREATEST(news_fetch_state.watermark, news_fetch_state.pending_watermark,
+                                  EXCLUDED.watermark)
+                    ELSE GREATEST(news_fetch_state.watermark, EXCLUDED.watermark) END,
+                backfill_to = CASE WHEN EXCLUDED.last_complete THEN NULL
+                    ELSE COALESCE(EXCLUDED.backfill_to, news_fetch_state.backfill_to) END,
+                pending_watermark = CASE WHEN EXCLUDED.last_complete THEN NULL
+                    ELSE GREATEST(news_fetch_state.pending_watermark, EXCLUDED.pending_watermark) END,
+                last_requests = EXCLUDED.last_requests,
+                last_complete = EXCLUDED.last_complete,
+                updated_at = now()
+        """, (stock_symbol.upper(), watermark, backfill_to, pending, fetched['requests'], complete))
+    except Exception as e:
+        print(f"Could not update news fetch state for {stock_symbol}: {e}")
+
+
 # ========== Query Helpers ==========
 
 def get_article_by_url(url: str) -> dict:
@@ -120,11 +263,11 @@ def get_unscored_articles(ticker: str, limit: int = 50) -> list:
     """Get articles without sentiment scores (for scoring pipeline)."""
     return query("""
         SELECT i.* FROM items i
-        LEFT JOIN item_scores s ON i.id = s.item_id AND s.model = 'hf_fin_v1'
+        LEFT JOIN item_scores s ON i.id = s.item_id AND s.model = %s
         WHERE i.ticker = %s AND s.item_id IS NULL
         ORDER BY i.published_at DESC
         LIMIT %s
-    """, (ticker.upper(), limit))
+    """, (get_active_model_key(), ticker.upper(), limit))
 
 
 def count_articles_by_ticker(ticker: str) -> int:
@@ -0,0 +1,100 @@
+"""
+Stored article text per item (item_texts table).
+
+Full-tier scoring reads article text from here first and downloads only
+items without a usable stored copy, storing the result (including failed
+fetches, with their status) so re-scoring under a new model key or
+retrying a task never downloads the same article twice.
+
+Fetches that failed for transient reasons (RETRY_STATUSES, HTTP 5xx) are
+retried on the next run; permanent failures (HTTP 4xx, no extractable text)
+are not, and those items fall back to title + snippet.
+"""
+from article_fetcher import get_fetcher
+from db import fetch_all, execute_values
+from score_cache import text_hash
+
+RETRY_STATUSES = {"timeout", "error"}
+
+
+def _needs_fetch(row: dict | None) -> bool:
+    if row is None:
+        return True
+    status = row["fetch_status"]
+    return status in RETRY_STATUSES or status.startswith("http_5")
+
+
+def load(item_ids: list) -> dict[str, dict]:
+    """Stored text rows keyed by item id (empty if the table is unavailable)."""
+    if not item_ids:
+        return {}
+
+    try:
+        rows = fetch_all("""
+            SELECT item_id::text AS item_id, text, fetch_status
+            FROM item_texts
+            WHERE item_id = ANY(%s::uuid[])
+        """, ([str(i) for i in item_ids],))
+    except Exception as e:
+        print(f"    -> Stored article text unavailable: {e}")
+        return {}
+
+    return {row["item_id"]: row for row in rows}
+
+
+def store(entries: list[tuple[str, str, str]]) -> int:
+    """
+    Store fetched article text.
+
+    Args:
+        entries: (item_id, text, fetch_status) tuples; text is '' on failure
+    """
+    return execute_values("""
+        INSERT INTO item_texts (item_id, text_hash, text, fetch_status)
+        VALUES %s
+        ON CONFLICT (item_id) DO UPDATE SET
+            text_hash = EXCLUDED.text_hash,
+            text = EXCLUDED.text,
+            fetch_status = EXCLUDED.fetch_status,
+            fetched_at = now()
+    """, [
+        (item_id, text_hash(text) if text else None, text, status)
+        for item_id, text, status in entries
+    ])
+
+
+def prefetch_missing(items: list[dict]) -> int:
+    """Start background downloads for items without usable stored text."""
+    stored = load([item["id"] for item in items])
+    urls = [item["url"] for item in items if _needs_fetch(stored.get(str(item["id"])))]
+    get_fetcher().prefetch(urls)
+    return len(urls)
+
+
+def get_texts(items: list[dict]) -> dict[str, str]:
+    """
+    Article text for items, keyed by item id ('' where extraction failed).
+
+    Stored text is used where available; the rest is downloaded
+    concurrently and stored.
+    """
+    stored = load([item["id"] for item in items])
+    missing = [item for item in items if _needs_fetch(stored.get(str(item["id"])))]
+
+    fetcher = get_fetcher()
+    fetcher.prefetch([item["url"] for item in missing])
+
+    fetched = []
+    for item in missing:
+        result = fetcher.get(item["url"])
+        fetched.append((str(item["id"]), result["text"], result["status"]))
+
+    if fetched:
+        try:
+            store(fetched)
+        except Exception as e:
+            print(f"    -> Could not store article text: {e}")
+
+    texts = {item_id: row["text"] or "" for item_id, row in stored.items()}
+    texts.update({item_id: text for item_id, text, _ in fetched})
+    return texts
@@ -0,0 +1,557 @@
+"""
+Inference benchmarks for ml/sentiment.py.
+
+Usage (from jobs/):
+  python ml/benchmark.py padding            - Compare naive vs length-bucketed batching
+  python ml/benchmark.py chunking           - Compare decode/re-encode vs direct input ids
+  python ml/benchmark.py parity <backend>   - Check a backend's scores against fp32 torch
+  python ml/benchmark.py startup            - Time worker import and first-score latency
+  python ml/benchmark.py suite [options]    - Throughput / latency / peak RSS grid, saved as JSON
+  python ml/benchmark.py compare <baseline.json> <candidate.json>
+
+Suite options (comma-separated lists):
+  --backends torch,quantized   (default: torch)
+  --batch-sizes 1,8,32         (default: 1,8,32)
+  --threads 1,4                (default: 1 and cpu_count; not applied to onnx,
+                               which is recorded with threads null)
+  --output path.json           (default: .cache/benchmarks/<timestamp>.json)
+"""
+import os
+import sys
+import json
+import time
+import random
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from ml import sentiment
+
+HEADLINE_WORDS = [
+    "shares", "surge", "fall", "after", "earnings", "beat", "miss", "analysts",
+    "upgrade", "downgrade", "guidance", "revenue", "growth", "slows", "record",
+    "deliveries", "margin", "pressure", "rally", "selloff", "outlook", "raises",
+    "cuts", "price", "target", "investors", "await", "quarterly", "report",
+]
+
+# Hand-written financial headlines with an unambiguous expected direction,
+# used alongside the generated corpus for backend parity checks.
+PARITY_SENTENCES = [
+    "Apple stock soars after strong earnings report.",
+    "Tesla faces challenges amid increasing competition.",
+    "The market remained relatively stable today.",
+    "Nvidia raises full-year guidance as data center revenue doubles.",
+    "JPMorgan shares slide after the bank warns of rising loan losses.",
+    "Pfizer cuts revenue forecast on weaker vaccine demand.",
+    "GameStop reports narrower quarterly loss, shares jump in late trading.",
+    "Analysts downgrade the retailer citing margin pressure and slowing sales.",
+    "The company will hold its annual shareholder meeting on Thursday.",
+    "Regulators approve the merger, clearing the way for a record deal.",
+    "Shares were unchanged in premarket trading ahead of the Fed decision.",
+    "The automaker recalls 100,000 vehicles over a faulty airbag sensor.",
+]
+
+# Parity thresholds for non-fp32 backends
+PARITY_MIN_LABEL_AGREEMENT = 0.95
+PARITY_MAX_MEAN_SCORE_DIFF = 0.05
+
+# Benchmark suite grid defaults
+SUITE_BATCH_SIZES = (1, 8, 32)
+SUITE_RESULTS_DIR = Path(__file__).parent.parent / ".cache" / "benchmarks"
+
+
+def _sentence(rng: random.Random, n_words: int) -> str:
+    words = [rng.choice(HEADLINE_WORDS) for _ in range(n_words)]
+    return " ".join(words).capitalize() + "."
+
+
+def build_corpus(n_headlines: int = 48, n_articles: int = 8, seed: int = 7) -> list[str]:
+    """
+    Build a fixed, offline corpus mixing short headlines and long articles.
+
+    The mix mirrors what score_unscored_items sees: most items fall back to
+    title + snippet, a few have full multi-chunk article text.
+    """
+    rng = random.Random(seed)
+
+    headlines = [f"ACME {_sentence(rng, rng.randint(6, 14))}" for _ in range(n_headlines)]
+    articles = [
+        " ".join(_sentence(rng, rng.randint(12, 24)) for _ in range(rng.randint(40, 160)))
+        for _ in range(n_articles)
+    ]
+
+    corpus = headlines + articles
+    rng.shuffle(corpus)
+    return corpus
+
+
+def build_suite_corpus(seed: int = 11) -> dict[str, list[str]]:
+    """
+    Fixed, offline corpus for the benchmark suite, one list per text shape.
+
+    - headlines: single titles (one short chunk)
+    - snippets: title + snippet sized texts (one medium chunk)
+    - articles: full article bodies (several 512-token chunks)
+    """
+    rng = random.Random(seed)
+    return {
+        "headlines": [f"ACME {_sentence(rng, rng.randint(6, 14))}" for _ in range(64)],
+        "snippets": [
+            " ".join(_sentence(rng, rng.randint(10, 18)) for _ in range(rng.randint(3, 6)))
+            for _ in range(32)
+        ],
+        "articles": [
+            " ".join(_sentence(rng, rng.randint(12, 24)) for _ in range(rng.randint(60, 160)))
+            for _ in range(8)
+        ],
+    }
+
+
+def _collect_chunks(texts: list[str]) -> list[list[int]]:
+    """Chunk every text and return the flat list of input id windows."""
+    all_chunks = []
+    for text in texts:
+        all_chunks.extend(sentiment.chunk_text_to_input_ids(text))
+    return all_chunks
+
+
+def _best_of(fn, repeats: int) -> float:
+    """Run fn `repeats` times and return the fastest wall time in seconds."""
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_padding(repeats: int = 3) -> dict:
+    """
+    Measure tokens/sec for naive batching vs length-bucketed batching.
+
+    Both variants score the same chunks; only the batch composition differs.
+    """
+    corpus = build_corpus()
+    chunks = _collect_chunks(corpus)
+    total_tokens = sum(len(c) for c in chunks)
+    arrival_order = list(range(len(chunks)))
+
+    # Load model and run once so neither variant pays the cold start
+    sentiment.score_input_ids(chunks[:2])
+
+    timings = {
+        "unbucketed": _best_of(
+            lambda: sentiment._score_id_batches(chunks, arrival_order), repeats
+        ),
+        "bucketed": _best_of(lambda: sentiment.score_input_ids(chunks), repeats),
+    }
+
+    result = {
+        "chunks": len(chunks),
+        "tokens": total_tokens,
+        "unbucketed_seconds": round(timings["unbucketed"], 3),
+        "bucketed_seconds": round(timings["bucketed"], 3),
+        "unbucketed_tokens_per_sec": round(total_tokens / timings["unbucketed"], 1),
+        "bucketed_tokens_per_sec": round(total_tokens / timings["bucketed"], 1),
+        "speedup": round(timings["unbucketed"] / timings["bucketed"], 2),
+    }
+
+    print(f"Chunks: {result['chunks']}, tokens: {result['tokens']}")
+    print(f"  unbucketed: {result['unbucketed_tokens_per_sec']} tokens/sec")
+    print(f"  bucketed:   {result['bucketed_tokens_per_sec']} tokens/sec")
+    print(f"  speedup:    {result['speedup']}x")
+
+    return result
+
+
+def bench_chunking(repeats: int = 3) -> dict:
+    """
+    Measure end-to-end article scoring: decode/re-encode vs direct input ids.
+
+    The legacy path decodes each token window to text and lets the pipeline
+    tokenize it again; the direct path feeds the windows to the model as-is.
+    """
+    articles = build_corpus(n_headlines=0, n_articles=16)
+
+    def legacy():
+        for text in articles:
+            sentiment.aggregate_chunk_scores(
+                sentiment.score_chunks(sentiment.chunk_text_to_512_tokens(text))
+            )
+
+    def direct():
+        for text in articles:
+            sentiment.aggregate_chunk_scores(
+                sentiment.score_input_ids(sentiment.chunk_text_to_input_ids(text))
+            )
+
+    # Warm both paths
+    sentiment.score_chunks(["warm up"])
+    sentiment.score_text("warm up")
+
+    timings = {
+        "legacy": _best_of(legacy, repeats),
+        "direct": _best_of(direct, repeats),
+    }
+
+    result = {
+        "articles": len(articles),
+        "legacy_articles_per_sec": round(len(articles) / timings["legacy"], 2),
+        "direct_articles_per_sec": round(len(articles) / timings["direct"], 2),
+        "speedup": round(timings["legacy"] / timings["direct"], 2),
+    }
+
+    print(f"Articles: {result['articles']}")
+    print(f"  decode/re-encode: {result['legacy_articles_per_sec']} articles/sec")
+    print(f"  direct ids:       {result['direct_articles_per_sec']} articles/sec")
+    print(f"  speedup:          {result['speedup']}x")
+
+    return result
+
+
+def check_backend_parity(backend: str) -> dict:
+    """
+    Compare a backend's article scores against the fp32 torch model.
+
+    Scores PARITY_SENTENCES plus the generated corpus with both backends and
+    reports label agreement and score drift. `passed` is False if agreement
+    drops below PARITY_MIN_LABEL_AGREEMENT or the mean absolute score
+    difference exceeds PARITY_MAX_MEAN_SCORE_DIFF.
+    """
+    texts = PARITY_SENTENCES + build_corpus()
+
+    reference = sentiment.score_batch(texts, backend="torch")
+    candidate = sentiment.score_batch(texts, backend=backend)
+
+    agree = sum(
+        1 for r, c in zip(reference, candidate)
+        if r["sentiment_label"] == c["sentiment_label"]
+    )
+    diffs = [
+        abs(r["sentiment_score"] - c["sentiment_score"])
+        for r, c in zip(reference, candidate)
+    ]
+
+    label_agreement = agree / len(texts)
+    mean_score_diff = sum(diffs) / len(diffs)
+
+    result = {
+        "backend": backend,
+        "texts": len(texts),
+        "label_agreement": round(label_agreement, 4),
+        "mean_score_diff": round(mean_score_diff, 4),
+        "max_score_diff": round(max(diffs), 4),
+        "passed": (
+            label_agreement >= PARITY_MIN_LABEL_AGREEMENT
+            and mean_score_diff <= PARITY_MAX_MEAN_SCORE_DIFF
+        ),
+    }
+
+    status = "PASS" if result["passed"] else "FAIL"
+    print(f"Parity {backend} vs torch: {status}")
+    print(f"  label agreement: {result['label_agreement']:.2%}")
+    print(f"  score diff: mean {result['mean_score_diff']}, max {result['max_score_diff']}")
+
+    return result
+
+
+# Runs in a fresh interpreter (cwd = jobs/) and prints one JSON line of timings
+_STARTUP_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import worker
+from ml import sentiment
+timings = {"import_seconds": time.perf_counter() - started}
+if sys.argv[1] == "warm":
+    timings["warm_up_seconds"] = sentiment.warm_up()
+started = time.perf_counter()
+sentiment.score_batch_local(["Shares rose after the company beat earnings estimates."])
+timings["first_score_seconds"] = time.perf_counter() - started
+print(json.dumps(timings))
+"""
+
+
+def _run_startup_probe(mode: str) -> dict:
+    """Run the startup probe in a new process and return its timings."""
+    env = dict(os.environ, SENTIMENT_SERVICE_URL="")
+    proc = subprocess.run(
+        [sys.executable, "-c", _STARTUP_PROBE, mode],
+        cwd=Path(__file__).parent.parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def bench_startup(repeats: int = 3) -> dict:
+    """
+    Measure process start-up cost for a worker.
+
+    Each run is a fresh interpreter, so nothing is shared between runs
+    except the OS page cache. "cold" scores the first item straight after
+    import; "warm" calls sentiment.warm_up() first, as the worker does.
+    """
+    runs = {"cold": [], "warm": []}
+    for _ in range(repeats):
+        for mode in runs:
+            runs[mode].append(_run_startup_probe(mode))
+
+    def best(mode: str, key: str) -> float:
+        return round(min(r[key] for r in runs[mode]), 3)
+
+    result = {
+        "import_seconds": best("cold", "import_seconds"),
+        "cold_first_score_seconds": best("cold", "first_score_seconds"),
+        "warm_up_seconds": best("warm", "warm_up_seconds"),
+        "warmed_first_score_seconds": best("warm", "first_score_seconds"),
+    }
+
+    print(f"Worker import:               {result['import_seconds']}s")
+    print(f"First score (cold):          {result['cold_first_score_seconds']}s")
+    print(f"Warm-up:                     {result['warm_up_seconds']}s")
+    print(f"First score (after warm-up): {result['warmed_first_score_seconds']}s")
+
+    return result
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB."""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def run_suite_backend(backend: str, batch_sizes, thread_counts) -> list[dict]:
+    """
+    Run the benchmark grid for one backend in this process.
+
+    For each thread count and batch size, every corpus shape is scored in
+    calls of `batch_size` texts (the model also batches `batch_size` chunks).
+    Latency is per score_batch_local call. peak_rss_mb is the process
+    high-water mark, so it only grows across the grid.
+
+    onnx runs on onnxruntime's own thread pool, which torch.set_num_threads
+    does not affect: it is run once, with threads recorded as None.
+    """
+    import torch
+
+    corpus = build_suite_corpus()
+    tokens = {name: sum(len(c) for c in _collect_chunks(texts)) for name, texts in corpus.items()}
+
+    # Pay the model load before any timing
+    sentiment.score_batch_local(["warm up"], backend=backend)
+
+    default_batch_size = sentiment.BATCH_SIZE
+    if backend == "onnx":
+        thread_counts = [None]
+
+    results = []
+    try:
+        for threads in thread_counts:
+            if threads is not None:
+                torch.set_num_threads(threads)
+            for batch_size in batch_sizes:
+                sentiment.BATCH_SIZE = batch_size
+                for name, texts in corpus.items():
+                    latencies = []
+                    started = time.perf_counter()
+                    for i in range(0, len(texts), batch_size):
+                        call_started = time.perf_counter()
+                        sentiment.score_batch_local(texts[i:i + batch_size], backend=backend)
+                        latencies.append((time.perf_counter() - call_started) * 1000)
+                    elapsed = time.perf_counter() - started
+
+                    result = {
+                        "backend": backend,
+                        "threads": threads,
+                        "batch_size": batch_size,
+                        "corpus": name,
+                        "texts": len(texts),
+                        "tokens": tokens[name],
+                        "seconds": round(elapsed, 4),
+                        "texts_per_sec": round(len(texts) / elapsed, 2),
+                        "tokens_per_sec": round(tokens[name] / elapsed, 1),
+                        "latency_ms_p50": round(_percentile(latencies, 50), 2),
+                        "latency_ms_p90": round(_percentile(latencies, 90), 2),
+                        "latency_ms_p99": round(_percentile(latencies, 99), 2),
+                        "peak_rss_mb": _peak_rss_mb(),
+                    }
+                    results.append(result)
+                    print(
+                        f"  {backend:9} threads={str(threads):<4} batch={batch_size:<3} {name:9} "
+                        f"{result['texts_per_sec']:>8} texts/s {result['tokens_per_sec']:>10} tok/s "
+                        f"p50 {result['latency_ms_p50']}ms p99 {result['latency_ms_p99']}ms "
+                        f"rss {result['peak_rss_mb']}MB"
+                    )
+    finally:
+        sentiment.BATCH_SIZE = default_batch_size
+
+    return results
+
+
+def _suite_meta() -> dict:
+    """Environment details stored with suite results."""
+    import torch
+    import transformers
+
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        revision = None
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": revision,
+        "model": sentiment.MODEL_NAME,
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "transformers": transformers.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def bench_suite(
+    backends=("torch",),
+    batch_sizes=SUITE_BATCH_SIZES,
+    thread_counts=None,
+    output: str | None = None,
+) -> dict:
+    """
+    Run the full benchmark grid and write the results as JSON.
+
+    Each backend runs in a fresh process so its peak RSS is not inflated by
+    models loaded for other backends.
+
+    Returns:
+        {"meta": {...}, "results": [...]} as written to `output`
+    """
+    thread_counts = thread_counts or sorted({1, os.cpu_count() or 1})
+    output = Path(output) if output else (
+        SUITE_RESULTS_DIR / f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    results = []
+    for backend in backends:
+        print(f"Backend {backend}:")
+        part = output.with_suffix(f".{backend}.part")
+        subprocess.run(
+            [
+                sys.executable, __file__, "suite-backend", backend,
+                "--batch-sizes", ",".join(str(b) for b in batch_sizes),
+                "--threads", ",".join(str(t) for t in thread_counts),
+                "--output", str(part),
+            ],
+            check=True,
+        )
+        results.extend(json.loads(part.read_text()))
+        part.unlink()
+
+    report = {"meta": _suite_meta(), "results": results}
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+    return report
+
+
+def compare_results(baseline_path: str, candidate_path: str) -> list[dict]:
+    """
+    Compare two suite result files config by config.
+
+    Returns one row per config present in both, with the tokens/sec ratio
+    (candidate / baseline) and the change in p50 latency.
+    """
+    def load(path):
+        report = json.loads(Path(path).read_text())
+        return {
+            (r["backend"], r["threads"], r["batch_size"], r["corpus"]): r
+            for r in report["results"]
+        }
+
+    baseline = load(baseline_path)
+    candidate = load(candidate_path)
+
+    rows = []
+    for key in sorted(baseline.keys() & candidate.keys()):
+        base, cand = baseline[key], candidate[key]
+        row = {
+            "backend": key[0],
+            "threads": key[1],
+            "batch_size": key[2],
+            "corpus": key[3],
+            "tokens_per_sec_ratio": round(cand["tokens_per_sec"] / base["tokens_per_sec"], 3),
+            "latency_ms_p50_change": round(cand["latency_ms_p50"] - base["latency_ms_p50"], 2),
+            "peak_rss_mb_change": round(cand["peak_rss_mb"] - base["peak_rss_mb"], 1),
+        }
+        rows.append(row)
+        print(
+            f"  {row['backend']:9} threads={str(row['threads']):<4} batch={row['batch_size']:<3} "
+            f"{row['corpus']:9} {row['tokens_per_sec_ratio']:>6}x tok/s  "
+            f"p50 {row['latency_ms_p50_change']:+}ms  rss {row['peak_rss_mb_change']:+}MB"
+        )
+
+    return rows
+
+
+def _list_option(args: list[str], name: str, default, cast=str):
+    """Parse a comma-separated --option from args."""
+    if name in args:
+        return [cast(v) for v in args[args.index(name) + 1].split(",") if v]
+    return default
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "padding"
+
+    if command == "padding":
+        bench_padding()
+    elif command == "chunking":
+        bench_chunking()
+    elif command == "startup":
+        bench_startup()
+    elif command == "suite":
+        args = sys.argv[2:]
+        output = args[args.index("--output") + 1] if "--output" in args else None
+        bench_suite(
+            backends=_list_option(args, "--backends", ["torch"]),
+            batch_sizes=_list_option(args, "--batch-sizes", SUITE_BATCH_SIZES, int),
+            thread_counts=_list_option(args, "--threads", None, int),
+            output=output,
+        )
+    elif command == "suite-backend":
+        # Internal: one backend of `suite`, run in its own process
+        args = sys.argv[3:]
+        results = run_suite_backend(
+            sys.argv[2],
+            _list_option(args, "--batch-sizes", SUITE_BATCH_SIZES, int),
+            _list_option(args, "--threads", [1], int),
+        )
+        Path(args[args.index("--output") + 1]).write_text(json.dumps(results))
+    elif command == "compare":
+        if len(sys.argv) < 4:
+            print(__doc__)
+            sys.exit(1)
+        compare_results(sys.argv[2], sys.argv[3])
+    elif command == "parity":
+        backend = sys.argv[2] if len(sys.argv) > 2 else "quantized"
+        result = check_backend_parity(backend)
+        sys.exit(0 if result["passed"] else 1)
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -2,91 +2,211 @@
 Sentiment scoring using HuggingFace model with proper 512-token chunking.
 
 Model: mrm8488/distilroberta-finetuned-financial-news-sentiment-analysis
+(override with SENTIMENT_MODEL_NAME when re-scoring under a new model key)
+
+Inference backends (SENTIMENT_BACKEND env var):
+- torch: fp32 PyTorch model (default)
+- quantized: dynamic int8 quantization of Linear layers (CPU)
+- onnx: ONNX Runtime via optimum (requires `pip install optimum[onnxruntime]`)
+
+If SENTIMENT_SERVICE_URL is set (e.g. http://127.0.0.1:8765), score_text and
+score_batch send texts to the long-lived scoring server in ml/server.py
+instead of loading the model in this process.
+
+transformers and torch are imported lazily, on first model use, so that
+importing this module (and everything that imports it: the worker, the
+scoring jobs, spawned pool processes) stays cheap. Call warm_up() to pay
+the load up front instead of on the first scored item.
 """
+import os
+import time
 from functools import lru_cache
-from transformers import pipeline, AutoTokenizer
+from pathlib import Path
 
 # Model configuration
-MODEL_NAME = "mrm8488/distilroberta-finetuned-financial-news-sentiment-analysis"
+MODEL_NAME = os.getenv(
+    "SENTIMENT_MODEL_NAME",
+    "mrm8488/distilroberta-finetuned-financial-news-sentiment-analysis",
+)
 MAX_TOKENS = 512
 CHUNK_OVERLAP = 64
 MAX_CHUNKS = 6
 BATCH_SIZE = 16
 
+# Inference backend configuration
+BACKENDS = ("torch", "quantized", "onnx")
+DEFAULT_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch").lower()
+ONNX_CACHE_DIR = Path(__file__).parent.parent / ".cache" / "onnx"
+
+# Optional scoring service (see ml/server.py)
+SERVICE_URL = os.getenv("SENTIMENT_SERVICE_URL", "").rstrip("/")
+SERVICE_TIMEOUT = 120
+
 
 @lru_cache(maxsize=1)
 def get_tokenizer():
     """Load the tokenizer (cached)."""
+    from transformers import AutoTokenizer
     return AutoTokenizer.from_pretrained(MODEL_NAME)
 
 
-@lru_cache(maxsize=1)
-def get_sentiment_pipeline():
-    """Load the sentiment model pipeline (cached)."""
-    print(f"Loading sentiment model: {MODEL_NAME}")
-    return pipeline("sentiment-analysis", model=MODEL_NAME)
+def resolve_backend(backend: str | None = None) -> str:
+    """Normalize a backend name, defaulting to SENTIMENT_BACKEND."""
+    backend = (backend or DEFAULT_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend: {backend} (expected one of {BACKENDS})")
+    return backend
 
 
-def chunk_text_to_512_tokens(text: str) -> list[str]:
+def get_model(backend: str | None = None):
+    """
+    Load the sequence classification model for a backend (cached per backend).
+
+    Args:
+        backend: "torch" | "quantized" | "onnx" (default: SENTIMENT_BACKEND)
+    """
+    return _load_model(resolve_backend(backend))
+
+
+@lru_cache(maxsize=len(BACKENDS))
+def _load_model(backend: str):
+    """Load the model for an already-resolved backend name."""
+    print(f"Loading sentiment model: {MODEL_NAME} (backend={backend})")
+
+    if backend == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+        except ImportError as e:
+            raise RuntimeError(
+                "ONNX backend requires optimum: pip install optimum[onnxruntime]"
+            ) from e
+
+        # Export once, then reuse the exported graph on later starts
+        export_dir = ONNX_CACHE_DIR / MODEL_NAME.replace("/", "__")
+        if (export_dir / "model.onnx").exists():
+            return ORTModelForSequenceClassification.from_pretrained(export_dir)
+        model = ORTModelForSequenceClassification.from_pretrained(MODEL_NAME, export=True)
+        model.save_pretrained(export_dir)
+        return model
+
+    from transformers import AutoModelForSequenceClassification
+    model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+    model.eval()
+
+    if backend == "quantized":
+        import torch
+        model = torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+    return model
+
+
+def get_sentiment_pipeline(backend: str | None = None):
+    """Load the sentiment model pipeline for a backend (cached)."""
+    return _load_pipeline(resolve_backend(backend))
+
+
+@lru_cache(maxsize=len(BACKENDS))
+def _load_pipeline(backend: str):
+    """Build the pipeline for an already-resolved backend name."""
+    from transformers import pipeline
+    return pipeline(
+        "sentiment-analysis",
+        model=_load_model(backend),
+        tokenizer=get_tokenizer(),
+    )
+
+
+def chunk_text_to_input_ids(text: str) -> list[list[int]]:
     """
-    Split text into chunks of max 512 tokens using the model's tokenizer.
+    Split text into model-ready token id windows of at most 512 tokens.
+
+    Each window already includes the model's special tokens (<s> ... </s>),
+    so it can be fed to the model directly without decoding back to a
+    string and re-tokenizing.
 
     Args:
         text: Input text to chunk
 
     Returns:
-        List of text chunks, each fitting within 512 tokens
+        List of input id lists, each at most MAX_TOKENS long
     """
     if not text or not text.strip():
         return []
 
     tokenizer = get_tokenizer()
 
-    # Tokenize without special tokens to get raw token count
-    token_ids = tokenizer.encode(text, add_special_tokens=False)
-
-    # If text fits in one chunk, return as-is
-    if len(token_ids) <= MAX_TOKENS:
-        return [text]
-
-    # Calculate step size with overlap
-    step = MAX_TOKENS - CHUNK_OVERLAP
-
-    chunks = []
-    for i in range(0, len(token_ids), step):
-        chunk_ids = token_ids[i:i + MAX_TOKENS]
-        chunk_text = tokenizer.decode(chunk_ids, skip_special_tokens=True)
-        chunks.append(chunk_text)
-
-        # Stop at MAX_CHUNKS to prevent super long articles from taking too long
-        if len(chunks) >= MAX_CHUNKS:
-            break
+    # One tokenization pass; the fast tokenizer emits overlapping windows
+    # that already carry special tokens and fit within MAX_TOKENS
+    encoded = tokenizer(
+        text,
+        max_length=MAX_TOKENS,
+        truncation=True,
+        stride=CHUNK_OVERLAP,
+        return_overflowing_tokens=True,
+        return_attention_mask=False,
+    )
 
-    return chunks
+    # Stop at MAX_CHUNKS to prevent super long articles from taking too long
+    return encoded["input_ids"][:MAX_CHUNKS]
 
 
-def score_chunks(chunks: list[str]) -> list[dict]:
+def score_input_ids(chunk_ids: list[list[int]], backend: str | None = None) -> list[dict]:
     """
-    Score multiple text chunks in a batch.
+    Score token id windows in length-bucketed batches.
+
+    Windows are sorted by length and split into batches of BATCH_SIZE, so
+    each batch is padded only to its own longest member. Results are
+    returned in the original order.
 
     Args:
-        chunks: List of text chunks
+        chunk_ids: Input id lists from chunk_text_to_input_ids
+        backend: Inference backend (default: SENTIMENT_BACKEND)
 
     Returns:
-        List of raw model outputs (label + score for each chunk)
+        List of model outputs (label + score for each window)
     """
-    if not chunks:
+    if not chunk_ids:
         return []
 
-    pipe = get_sentiment_pipeline()
+    order = sorted(range(len(chunk_ids)), key=lambda i: len(chunk_ids[i]))
+    return _score_id_batches(chunk_ids, order, backend)
 
-    # Run the pipeline on all chunks at once
-    results = pipe(
-        chunks,
-        truncation=True,
-        max_length=MAX_TOKENS,
-        batch_size=min(BATCH_SIZE, len(chunks))
-    )
+
+def _score_id_batches(
+    chunk_ids: list[list[int]],
+    order: list[int],
+    backend: str | None = None,
+) -> list[dict]:
+    """Run the model over chunk_ids in BATCH_SIZE groups taken in `order`."""
+    import torch
+
+    model = get_model(backend)
+    pad_id = get_tokenizer().pad_token_id
+    id2label = model.config.id2label
+
+    results = [None] * len(chunk_ids)
+
+    for start in range(0, len(order), BATCH_SIZE):
+        bucket = order[start:start + BATCH_SIZE]
+        width = max(len(chunk_ids[i]) for i in bucket)
+
+        input_ids = torch.full((len(bucket), width), pad_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(bucket), width), dtype=torch.long)
+        for row, i in enumerate(bucket):
+            ids = chunk_ids[i]
+            input_ids[row, :len(ids)] = torch.tensor(ids, dtype=torch.long)
+            attention_mask[row, :len(ids)] = 1
+
+        with torch.inference_mode():
+            logits = model(input_ids=input_ids, attention_mask=attention_mask).logits
+
+        probs = torch.softmax(logits.float(), dim=-1)
+        confidences, labels = probs.max(dim=-1)
+
+        for i, label_id, conf in zip(bucket, labels.tolist(), confidences.tolist()):
+            results[i] = {"label": id2label[label_id], "score": conf}
 
     return results
 
@@ -168,6 +288,16 @@ def aggregate_chunk_scores(results: list[dict]) -> dict:
     }
 
 
+def _neutral_result() -> dict:
+    """Result used for empty text or scoring failures."""
+    return {
+        "sentiment_label": "NEUTRAL",
+        "sentiment_score": 0.0,
+        "confidence": 0.0,
+        "chunks_used": 0,
+    }
+
+
 def score_text(text: str) -> dict:
     """
     Score a single text for sentiment using proper 512-token chunking.
@@ -183,47 +313,163 @@ def score_text(text: str) -> dict:
         - chunks_used: number of chunks processed
     """
     if not text or not text.strip():
-        return {
-            "sentiment_label": "NEUTRAL",
-            "sentiment_score": 0.0,
-            "confidence": 0.0,
-            "chunks_used": 0,
-        }
+        return _neutral_result()
+
+    if SERVICE_URL:
+        return score_batch([text])[0]
+
+    return _score_text_local(text)
+
+
+def _load_for_scoring(backend: str | None = None) -> None:
+    """
+    Load the tokenizer and backend model, raising if either fails.
+
+    Called before the per-text error handling in the scoring functions, so
+    a backend that cannot load (e.g. onnx without optimum) is reported
+    instead of every text silently coming back neutral or from another
+    backend.
+    """
+    get_tokenizer()
+    get_model(backend)
+
+
+def _score_text_local(text: str, backend: str | None = None) -> dict:
+    """Score a single text with the in-process model."""
+    _load_for_scoring(backend)
 
     try:
         # Chunk the text
-        chunks = chunk_text_to_512_tokens(text)
+        chunks = chunk_text_to_input_ids(text)
 
         if not chunks:
-            return {
-                "sentiment_label": "NEUTRAL",
-                "sentiment_score": 0.0,
-                "confidence": 0.0,
-                "chunks_used": 0,
-            }
+            return _neutral_result()
 
         # Score all chunks
-        results = score_chunks(chunks)
+        results = score_input_ids(chunks, backend=backend)
 
         # Aggregate into final score
         return aggregate_chunk_scores(results)
 
     except Exception as e:
         print(f"Error scoring text: {e}")
-        return {
-            "sentiment_label": "NEUTRAL",
-            "sentiment_score": 0.0,
-            "confidence": 0.0,
-            "chunks_used": 0,
-        }
+        return _neutral_result()
+
+
+def score_batch(texts: list[str], backend: str | None = None) -> list[dict]:
+    """
+    Score multiple texts. Each text is chunked and aggregated independently.
+
+    Uses the scoring service when SENTIMENT_SERVICE_URL is set (and no
+    explicit backend is requested), falling back to the in-process model if
+    the service is unreachable.
+    """
+    if not texts:
+        return []
+
+    if SERVICE_URL and backend is None:
+        try:
+            return _score_batch_remote(texts)
+        except Exception as e:
+            print(f"Scoring service unavailable ({e}), scoring locally")
+
+    return score_batch_local(texts, backend=backend)
+
+
+def _score_batch_remote(texts: list[str]) -> list[dict]:
+    """Send texts to the scoring service and return its results."""
+    import requests
+
+    response = requests.post(
+        f"{SERVICE_URL}/score",
+        json={"texts": texts},
+        timeout=SERVICE_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()["results"]
+
+
+def score_batch_local(texts: list[str], backend: str | None = None) -> list[dict]:
+    """
+    Score multiple texts with the in-process model.
+
+    Chunks from all texts are pooled and scored together in length buckets,
+    so short headlines are never padded up to a 512-token article body.
+    Falls back to scoring texts one by one (same backend) if the pooled
+    batch fails; model/backend load errors are raised, not retried.
+    """
+    if not texts:
+        return []
+
+    _load_for_scoring(backend)
+
+    try:
+        owners = []
+        all_chunks = []
+        for idx, text in enumerate(texts):
+            chunks = chunk_text_to_input_ids(text)
+            owners.extend([idx] * len(chunks))
+            all_chunks.extend(chunks)
 
+        results = score_input_ids(all_chunks, backend=backend)
 
-def score_batch(texts: list[str]) -> list[dict]:
-    """Score multiple texts. Each text is chunked and aggregated independently."""
-    return [score_text(t) for t in texts]
+        per_text = [[] for _ in texts]
+        for idx, r in zip(owners, results):
+            per_text[idx].append(r)
+
+        return [aggregate_chunk_scores(r) for r in per_text]
+
+    except Exception as e:
+        print(f"Error scoring batch, falling back to per-text scoring: {e}")
+        return [_score_text_local(t, backend=backend) for t in texts]
+
+
+def warm_up(backend: str | None = None) -> float:
+    """
+    Load the tokenizer and model and run one dummy batch.
+
+    The first forward pass also pays one-off costs (thread pool start-up,
+    kernel selection), so a warmed process scores its first real item at
+    steady-state speed. No-op when scoring is delegated to SENTIMENT_SERVICE_URL.
+
+    Returns:
+        Seconds spent warming up
+    """
+    if SERVICE_URL:
+        return 0.0
+
+    started = time.perf_counter()
+    score_batch_local(
+        ["Shares rose after the company beat earnings estimates.", "warm up " * 200],
+        backend=backend,
+    )
+    return time.perf_counter() - started
 
 
 # Legacy aliases for compatibility
+def chunk_text_to_512_tokens(text: str) -> list[str]:
+    """Legacy interface - returns decoded text for each token window."""
+    tokenizer = get_tokenizer()
+    return [
+        tokenizer.decode(ids, skip_special_tokens=True)
+        for ids in chunk_text_to_input_ids(text)
+    ]
+
+
+def score_chunks(chunks: list[str], backend: str | None = None) -> list[dict]:
+    """Legacy interface - scores text chunks through the HF pipeline."""
+    if not chunks:
+        return []
+
+    pipe = get_sentiment_pipeline(backend)
+    return pipe(
+        chunks,
+        truncation=True,
+        max_length=MAX_TOKENS,
+        batch_size=min(BATCH_SIZE, len(chunks)),
+    )
+
+
 def score_text_legacy(text: str) -> dict:
     """Legacy interface - returns label/confidence/sentiment_score."""
     result = score_text(text)
@@ -0,0 +1,179 @@
+"""
+Local sentiment scoring service.
+
+Holds one copy of the model for every worker on the machine and
+micro-batches concurrent requests: requests arriving within MAX_WAIT_MS of
+each other (up to MAX_BATCH_TEXTS texts) are scored in a single pooled
+batch, so short REFRESH_STOCK tasks never pay the cold model load.
+
+Usage (from jobs/):
+  python ml/server.py [port]
+
+Clients opt in with SENTIMENT_SERVICE_URL=http://127.0.0.1:<port>.
+
+Endpoints:
+  GET  /health  -> {"status": "ok", "model": ..., "backend": ...}
+  POST /score   {"texts": [...]} -> {"results": [...]}
+"""
+import os
+import sys
+import json
+import time
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from ml import sentiment
+
+HOST = "127.0.0.1"
+PORT = int(os.getenv("SENTIMENT_SERVICE_PORT", "8765"))
+
+# Micro-batching budget
+MAX_WAIT_MS = 20
+MAX_BATCH_TEXTS = 64
+
+
+class _Request:
+    """One client request waiting for the batcher."""
+
+    def __init__(self, texts: list[str]):
+        self.texts = texts
+        self.results = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class MicroBatcher:
+    """Collects concurrent requests and scores them together on one thread."""
+
+    def __init__(self, max_wait_ms: int = MAX_WAIT_MS, max_batch_texts: int = MAX_BATCH_TEXTS):
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_texts = max_batch_texts
+        self.pending = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, texts: list[str]) -> list[dict]:
+        """Queue texts for scoring and block until the batch containing them is done."""
+        request = _Request(texts)
+        self.pending.put(request)
+        request.done.wait()
+        if request.error:
+            raise request.error
+        return request.results
+
+    def _collect(self) -> list[_Request]:
+        """Wait for one request, then gather more until the latency or size budget runs out."""
+        batch = [self.pending.get()]
+        n_texts = len(batch[0].texts)
+        deadline = time.monotonic() + self.max_wait
+
+        while n_texts < self.max_batch_texts:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self.pending.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            n_texts += len(request.texts)
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [t for request in batch for t in request.texts]
+
+            try:
+                results = sentiment.score_batch_local(texts)
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+                    request.done.set()
+                continue
+
+            offset = 0
+            for request in batch:
+                request.results = results[offset:offset + len(request.texts)]
+                offset += len(request.texts)
+                request.done.set()
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    """HTTP front end for the micro-batcher."""
+
+    batcher: MicroBatcher = None
+
+    def _send_json(self, status: int, body: dict):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {
+                "status": "ok",
+                "model": sentiment.MODEL_NAME,
+                "backend": sentiment.resolve_backend(),
+            })
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/score":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            texts = body.get("texts")
+            if not isinstance(texts, list):
+                raise ValueError("'texts' must be a list of strings")
+            texts = [t or "" for t in texts]
+        except Exception as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        try:
+            results = self.batcher.submit(texts)
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+
+        self._send_json(200, {"results": results})
+
+    def log_message(self, format, *args):
+        # Per-request access logs are too noisy for a hot path
+        pass
+
+
+def serve(host: str = HOST, port: int = PORT):
+    """Load the model, then serve scoring requests until interrupted."""
+    print(f"Scoring service: loading model ({sentiment.resolve_backend()} backend)...")
+    sentiment.score_batch_local(["warm up"])
+
+    ScoringHandler.batcher = MicroBatcher()
+    server = ThreadingHTTPServer((host, port), ScoringHandler)
+
+    print(f"Scoring service listening on http://{host}:{port}")
+    print(f"  Micro-batching: up to {MAX_BATCH_TEXTS} texts or {MAX_WAIT_MS}ms")
+    print("  Press Ctrl+C to stop")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nScoring service shutting down...")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    serve(port=port)
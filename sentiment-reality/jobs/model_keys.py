@@ -0,0 +1,111 @@
+"""
+Model keys stored in item_scores.model.
+
+Two tiers per model:
+- model key (e.g. hf_fin_v1): full article text score (preferred by every read path)
+- headline key (<model key>_headline): fast title + snippet score, used until
+  the full-text score for the item exists
+
+The active model key lives in scoring_models (one row with is_active). Jobs
+and the API resolve it per run/request, so activating a new key (see
+rescore_history.py) switches every read and write path in one transaction.
+SCORE_MODEL_KEY pins the key for a process regardless of the DB.
+"""
+import os
+from db import fetch_all, transaction
+
+DEFAULT_MODEL_KEY = "hf_fin_v1"
+MODEL_KEY_OVERRIDE = os.getenv("SCORE_MODEL_KEY", "")
+
+# SQL fragment picking one score per item: full-text if present, else headline.
+# Use as `JOIN LATERAL (PREFERRED_SCORE_SQL) s ON true` with preferred_score_params().
+PREFERRED_SCORE_SQL = """
+    SELECT sentiment_label, sentiment_score, confidence
+    FROM item_scores
+    WHERE item_id = i.id AND model IN (%s, %s)
+    ORDER BY (model = %s) DESC
+    LIMIT 1
+"""
+
+
+def headline_model_key(model_key: str) -> str:
+    """Key for the headline-tier scores of a model."""
+    return f"{model_key}_headline"
+
+
+def get_active_model_key() -> str:
+    """
+    Resolve the model key to score and read with.
+
+    SCORE_MODEL_KEY if set, else the active scoring_models row, else
+    DEFAULT_MODEL_KEY (also used if the table does not exist yet).
+    """
+    if MODEL_KEY_OVERRIDE:
+        return MODEL_KEY_OVERRIDE
+
+    try:
+        rows = fetch_all("SELECT model_key FROM scoring_models WHERE is_active")
+    except Exception as e:
+        print(f"Could not read active model key, using {DEFAULT_MODEL_KEY}: {e}")
+        return DEFAULT_MODEL_KEY
+
+    return rows[0]["model_key"] if rows else DEFAULT_MODEL_KEY
+
+
+def preferred_score_params(model_key: str | None = None) -> tuple[str, str, str]:
+    """Params for PREFERRED_SCORE_SQL (default: the active model key)."""
+    model_key = model_key or get_active_model_key()
+    return (model_key, headline_model_key(model_key), model_key)
+
+
+def get_model_name(model_key: str) -> str | None:
+    """HuggingFace model registered for a key, or None if the key is unregistered."""
+    try:
+        rows = fetch_all(
+            "SELECT model_name FROM scoring_models WHERE model_key = %s", (model_key,)
+        )
+    except Exception:
+        return None
+    return rows[0]["model_name"] if rows else None
+
+
+def register_model(model_key: str, model_name: str) -> None:
+    """
+    Register a model key (inactive) for a HuggingFace model.
+
+    Raises ValueError if the key is already registered to a different model,
+    since its existing scores would then mix two models.
+    """
+    registered = get_model_name(model_key)
+    if registered and registered != model_name:
+        raise ValueError(
+            f"Model key {model_key} is registered to {registered}, not {model_name}"
+        )
+
+    with transaction() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO scoring_models (model_key, model_name)
+                VALUES (%s, %s)
+                ON CONFLICT (model_key) DO NOTHING
+            """, (model_key, model_name))
+
+
+def activate_model(model_key: str) -> None:
+    """Make model_key the active key for every read and write path (atomic)."""
+    with transaction() as conn:
+        with conn.cursor() as cur:
+            # Lock the registry so concurrent activations serialize
+            cur.execute("LOCK TABLE scoring_models IN SHARE ROW EXCLUSIVE MODE")
+            cur.execute(
+                "SELECT 1 FROM scoring_models WHERE model_key = %s", (model_key,)
+            )
+            if cur.fetchone() is None:
+                raise ValueError(f"Model key {model_key} is not registered")
+
+            cur.execute("UPDATE scoring_models SET is_active = false WHERE is_active")
+            cur.execute("""
+                UPDATE scoring_models
+                SET is_active = true, activated_at = now()
+                WHERE model_key = %s
+            """, (model_key,))
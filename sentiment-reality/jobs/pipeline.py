@@ -4,12 +4,21 @@ Pipeline orchestration module.
 Provides run_pipeline_for_ticker() which runs the full pipeline:
 1. Ingest news -> upsert items
 2. Score unscored -> insert item_scores
-3. Ingest prices -> upsert prices_daily + compute return_1d
+3. Ingest prices (missing tail only, or full range) -> upsert prices_daily + compute return_1d
 4. Aggregate daily -> upsert daily_agg
-5. Metrics windowed -> upsert metrics_windowed
+5. Metrics windowed (all window sizes in one pass) -> upsert metrics_windowed
 """
-from datetime import datetime
-from db import execute, fetch_all, get_connection
+from datetime import date, datetime
+from db import copy_upsert, fetch_all, get_connection
+from model_keys import PREFERRED_SCORE_SQL, preferred_score_params
+
+# Calendar days re-fetched before a ticker's last stored price on incremental
+# runs, so revised closes are picked up. If the re-fetched closes of the
+# overlap differ from the stored ones by more than PRICE_ADJUSTMENT_TOLERANCE
+# (relative), Yahoo has re-adjusted the history (dividend, split) and the
+# ticker's full range is fetched instead.
+PRICE_OVERLAP_DAYS = 5
+PRICE_ADJUSTMENT_TOLERANCE = 0.0005
 
 
 def run_pipeline_for_ticker(
@@ -21,6 +30,10 @@ def run_pipeline_for_ticker(
     metrics_days: int = 90,
     window_days: int = 7,
     window_days_list: list[int] | None = None,
+    score_processes: int | None = None,
+    score_tier: str = "full",
+    news_max_requests: int | None = None,
+    prices_full: bool = False,
 ) -> dict:
     """
     Run the full data pipeline for a single ticker.
@@ -29,11 +42,18 @@ def run_pipeline_for_ticker(
         ticker: Stock symbol (e.g., 'TSLA')
         news_hours: Hours of news to fetch (default 48)
         score_limit: Max items to score (None = unlimited/200)
-        prices_days: Calendar days of prices to fetch (default 180)
+        prices_days: Calendar days of prices to keep current (default 180)
         agg_days: Days of daily aggregates to compute (default 90)
         metrics_days: Days of metrics to compute (default 90)
         window_days: Rolling window size for metrics (default 7)
         window_days_list: List of window sizes to compute (e.g., [7, 14, 30])
+        score_processes: Scoring processes (None = SCORE_PROCESSES env, default 1)
+        score_tier: "full" (article text) or "headline" (title + snippet only,
+            upgraded later by an UPGRADE_SCORES task)
+        news_max_requests: NewsAPI request cap for this ticker
+            (None = NEWSAPI_MAX_REQUESTS_PER_RUN)
+        prices_full: Re-fetch all prices_days instead of only the days since
+            the last stored price (periodic reconciliation, backfills)
 
     Returns:
         Summary dict with counts from each step
@@ -46,8 +66,8 @@ def run_pipeline_for_ticker(
 
     print(f"\n{'='*60}")
     print(f"PIPELINE: {ticker}")
-    print(f"  news_hours={news_hours}, score_limit={score_limit}")
-    print(f"  prices_days={prices_days}, agg_days={agg_days}")
+    print(f"  news_hours={news_hours}, score_limit={score_limit}, score_tier={score_tier}")
+    print(f"  prices_days={prices_days}, prices_full={prices_full}, agg_days={agg_days}")
     print(f"  metrics_days={metrics_days}, windows={windows}")
     print(f"{'='*60}")
 
@@ -61,22 +81,26 @@ def run_pipeline_for_ticker(
     try:
         # Step 1: Ingest news
         print("\n[1/5] Ingesting news...")
-        news_result = ingest_items(ticker, hours=news_hours)
+        news_result = ingest_items(ticker, hours=news_hours, max_requests=news_max_requests)
         summary["steps"]["ingest_news"] = news_result
         print(f"      → Inserted {news_result.get('inserted', 0)}, skipped {news_result.get('skipped', 0)}")
 
         # Step 2: Score unscored items
         print("\n[2/5] Scoring items...")
         limit = score_limit if score_limit else 200
-        score_result = score_items(ticker, limit=limit)
+        score_result = score_items(
+            ticker, limit=limit, processes=score_processes, tier=score_tier
+        )
         summary["steps"]["score_items"] = score_result
         print(f"      → Scored {score_result.get('scored', 0)}/{score_result.get('selected', 0)}")
 
         # Step 3: Ingest prices
         print("\n[3/5] Ingesting prices...")
-        prices_result = ingest_prices(ticker, days=prices_days)
+        prices_result = ingest_prices(ticker, days=prices_days, full=prices_full)
         summary["steps"]["ingest_prices"] = prices_result
-        print(f"      → Stored {prices_result.get('count', 0)} price records")
+        print(f"      → Stored {prices_result.get('count', 0)} price records "
+              f"({'full' if prices_result.get('full') else 'incremental'}, "
+              f"{prices_result.get('fetch_days', 0)} days)")
 
         # Step 4: Compute daily aggregates
         print("\n[4/5] Computing daily aggregates...")
@@ -86,11 +110,10 @@ def run_pipeline_for_ticker(
 
         # Step 5: Compute metrics for all window sizes
         print("\n[5/5] Computing metrics...")
-        metrics_results = {}
+        metrics_results = compute_metrics_multi(ticker, windows, days=metrics_days)
         total_metrics = 0
         for wd in windows:
-            result = compute_metrics_windowed(ticker, window_days=wd, days=metrics_days)
-            metrics_results[f"window_{wd}"] = result
+            result = metrics_results[f"window_{wd}"]
             total_metrics += result.get("count", 0)
             print(f"      → Window {wd}d: {result.get('count', 0)} rows")
         summary["steps"]["metrics"] = metrics_results
@@ -118,72 +141,161 @@ def run_pipeline_for_ticker(
 # Step implementations
 # ============================================================
 
-def ingest_items(ticker: str, hours: int) -> dict:
-    """Ingest news items from NewsAPI."""
+def ingest_items(ticker: str, hours: int, max_requests: int | None = None) -> dict:
+    """Ingest news items from the configured news providers (NEWS_PROVIDERS)."""
     from ingest_to_db import ingest_news_to_db
-    result = ingest_news_to_db(ticker, hours=hours)
+    result = ingest_news_to_db(ticker, hours=hours, max_requests=max_requests)
     return {
         "total": result.get("total_articles", 0),
         "inserted": result.get("inserted_count", 0),
         "skipped": result.get("skipped_count", 0),
+        "requests": result.get("requests", 0),
+        "complete": result.get("complete", False),
         "errors": len(result.get("errors", [])),
     }
 
 
-def score_items(ticker: str, limit: int) -> dict:
+def score_items(
+    ticker: str,
+    limit: int,
+    processes: int | None = None,
+    tier: str = "full",
+) -> dict:
     """Score unscored items using ML model."""
     from score_unscored_items import score_unscored_items
-    result = score_unscored_items(ticker, limit=limit)
+    result = score_unscored_items(ticker, limit=limit, processes=processes, tier=tier)
     return {
         "selected": result.get("selected", 0),
         "scored": result.get("scored", 0),
+        "cache_hits": result.get("cache_hits", 0),
         "skipped_no_text": result.get("skipped_no_text", 0),
         "errors": result.get("errors", 0),
     }
 
 
-def ingest_prices(ticker: str, days: int) -> dict:
-    """Ingest prices and compute returns."""
-    from providers.prices import fetch_daily_prices
+def get_last_price_dates(tickers: list[str]) -> dict[str, date]:
+    """Latest stored prices_daily date per ticker (tickers without prices omitted)."""
+    rows = fetch_all("""
+        SELECT ticker, MAX(date) AS last_date
+        FROM prices_daily
+        WHERE ticker = ANY(%s)
+        GROUP BY ticker
+    """, ([t.upper() for t in tickers],))
+    return {row["ticker"]: row["last_date"] for row in rows}
 
-    prices = fetch_daily_prices(ticker, days=days)
-    if not prices:
-        return {"count": 0}
 
-    # Upsert prices
-    count = 0
-    for p in prices:
-        execute("""
-            INSERT INTO prices_daily (ticker, date, open, high, low, close, adj_close, volume)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (ticker, date) DO UPDATE SET
-                open = EXCLUDED.open,
-                high = EXCLUDED.high,
-                low = EXCLUDED.low,
-                close = EXCLUDED.close,
-                adj_close = EXCLUDED.adj_close,
-                volume = EXCLUDED.volume
-        """, (ticker, p["date"], p["open"], p["high"], p["low"], p["close"], p["adj_close"], p["volume"]))
-        count += 1
-
-    # Compute return_1d using LAG for previous trading day
-    execute("""
-        WITH returns AS (
-            SELECT
-                ticker,
-                date,
-                (close - LAG(close) OVER (PARTITION BY ticker ORDER BY date)) /
-                    NULLIF(LAG(close) OVER (PARTITION BY ticker ORDER BY date), 0) * 100 AS return_1d
-            FROM prices_daily
-            WHERE ticker = %s
-        )
-        UPDATE prices_daily p
-        SET return_1d = r.return_1d
-        FROM returns r
-        WHERE p.ticker = r.ticker AND p.date = r.date
-    """, (ticker,))
+def price_fetch_days(last_date: date | None, days: int) -> int:
+    """Days of prices to fetch: the missing tail plus PRICE_OVERLAP_DAYS, at most `days`."""
+    if last_date is None:
+        return days
+    missing = (date.today() - last_date).days
+    return max(1, min(days, missing + PRICE_OVERLAP_DAYS))
+
+
+def prefetch_prices(tickers: list[str], days: int, full: bool = False) -> int:
+    """One bulk price download covering what ingest_prices() will need for every ticker."""
+    from providers.prices import prefetch_daily_prices
+
+    if not tickers:
+        return 0
+    last_dates = {} if full else get_last_price_dates(tickers)
+    fetch_days = max(price_fetch_days(last_dates.get(t.upper()), days) for t in tickers)
+    # One extra day: full fetches read the day before their range
+    return prefetch_daily_prices(tickers, days=fetch_days + 1)
+
+
+def ingest_prices(ticker: str, days: int, full: bool = False) -> dict:
+    """
+    Ingest prices and compute returns.
+
+    Only the days since the last stored price (plus PRICE_OVERLAP_DAYS) are
+    fetched and written, unless full=True or the ticker has no prices yet.
+    return_1d is computed for the written days only. An incremental fetch
+    whose overlap shows re-adjusted closes is redone as a full fetch.
+
+    Incremental returns chain from the last stored close before the fetched
+    days. A full fetch reads one extra day instead, since the stored close
+    before its range may predate a dividend/split re-adjustment.
+    """
+    from providers.prices import PRICE_COLUMNS, daily_returns, fetch_daily_prices, tail, to_rows
+
+    last_date = None if full else get_last_price_dates([ticker]).get(ticker)
+    fetch_days = price_fetch_days(last_date, days)
+    result = {"count": 0, "fetch_days": fetch_days, "full": last_date is None, "readjusted": False}
+
+    if last_date is not None:
+        prices = fetch_daily_prices(ticker, days=fetch_days)
+        if not len(prices["date"]):
+            return result
+
+        if history_readjusted(ticker, prices, last_date):
+            print(f"  {ticker}: stored closes were re-adjusted (dividend/split), fetching {days} days")
+            result.update(fetch_days=days, full=True, readjusted=True)
+
+    if result["full"]:
+        # The extra (oldest) day only supplies the first return's prior
+        # close; it is not written unless it is the only bar
+        prices = fetch_daily_prices(ticker, days=days + 1)
+        if not len(prices["date"]):
+            return result
+        prices["return_1d"] = daily_returns(prices["close"])
+        if len(prices["date"]) > 1:
+            prices = tail(prices, len(prices["date"]) - 1)
+    else:
+        prior_close = get_prior_close(ticker, prices["date"][0].astype(object))
+        prices["return_1d"] = daily_returns(prices["close"], prior_close)
+
+    # Bulk upsert straight from the price columns
+    result["count"] = upsert_daily_prices(ticker, to_rows(prices, PRICE_COLUMNS + ("return_1d",)))
+
+    return result
 
-    return {"count": count}
+
+def history_readjusted(ticker: str, prices: dict, last_date: date) -> bool:
+    """
+    True if fetched closes of already-stored days before last_date differ
+    from the stored ones by more than PRICE_ADJUSTMENT_TOLERANCE (relative).
+
+    last_date itself is skipped: it may have been stored from a bar that
+    was still trading.
+    """
+    rows = fetch_all("""
+        SELECT date, close FROM prices_daily
+        WHERE ticker = %s AND date >= %s AND date < %s AND close IS NOT NULL
+    """, (ticker, prices["date"][0].astype(object), last_date))
+    stored = {row["date"]: float(row["close"]) for row in rows}
+
+    for day, close in zip(prices["date"].astype(object), prices["close"].tolist()):
+        previous = stored.get(day)
+        if previous and abs(close - previous) > PRICE_ADJUSTMENT_TOLERANCE * abs(previous):
+            return True
+    return False
+
+
+def get_prior_close(ticker: str, before: date) -> float | None:
+    """Latest stored close strictly before `before` (None if there is none)."""
+    rows = fetch_all("""
+        SELECT close FROM prices_daily
+        WHERE ticker = %s AND date < %s
+        ORDER BY date DESC
+        LIMIT 1
+    """, (ticker, before))
+    return float(rows[0]["close"]) if rows and rows[0]["close"] is not None else None
+
+
+def upsert_daily_prices(ticker: str, rows: list[tuple]) -> int:
+    """
+    Upsert (date, open, high, low, close, adj_close, volume, return_1d) rows
+    into prices_daily. Of rows repeating a date (duplicate bars from the
+    provider), the last one is kept.
+    """
+    by_date = {row[0]: row for row in rows}
+    return copy_upsert(
+        "prices_daily",
+        ["ticker", "date", "open", "high", "low", "close", "adj_close", "volume", "return_1d"],
+        [(ticker, *row) for row in by_date.values()],
+        conflict_columns=["ticker", "date"],
+    )
 
 
 def compute_daily_agg(ticker: str, days: int) -> dict:
@@ -192,8 +304,8 @@ def compute_daily_agg(ticker: str, days: int) -> dict:
 
     cutoff_date = date.today() - timedelta(days=days)
 
-    # Get aggregates grouped by day
-    rows = fetch_all("""
+    # Get aggregates grouped by day (one score per item: full-text, else headline)
+    rows = fetch_all(f"""
         SELECT
             DATE(i.published_at) as date,
             AVG(s.sentiment_score) as sentiment_avg,
@@ -202,156 +314,83 @@ def compute_daily_agg(ticker: str, days: int) -> dict:
             SUM(CASE WHEN s.sentiment_label = 'NEUTRAL' THEN 1 ELSE 0 END) as neutral_count,
             SUM(CASE WHEN s.sentiment_label = 'NEGATIVE' THEN 1 ELSE 0 END) as negative_count
         FROM items i
-        JOIN item_scores s ON i.id = s.item_id
+        JOIN LATERAL ({PREFERRED_SCORE_SQL}) s ON true
         WHERE i.ticker = %s AND DATE(i.published_at) >= %s
         GROUP BY DATE(i.published_at)
         ORDER BY date
-    """, (ticker, cutoff_date))
+    """, (*preferred_score_params(), ticker, cutoff_date))
 
     if not rows:
         return {"count": 0}
 
-    # Upsert each day
-    count = 0
-    for row in rows:
-        execute("""
-            INSERT INTO daily_agg (ticker, date, sentiment_avg, article_count,
-                                   positive_count, neutral_count, negative_count)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (ticker, date) DO UPDATE SET
-                sentiment_avg = EXCLUDED.sentiment_avg,
-                article_count = EXCLUDED.article_count,
-                positive_count = EXCLUDED.positive_count,
-                neutral_count = EXCLUDED.neutral_count,
-                negative_count = EXCLUDED.negative_count
-        """, (
-            ticker,
-            row["date"],
-            float(row["sentiment_avg"]) if row["sentiment_avg"] else 0,
-            row["article_count"],
-            row["positive_count"],
-            row["neutral_count"],
-            row["negative_count"],
-        ))
-        count += 1
+    # Upsert every day in one bulk load
+    count = copy_upsert(
+        "daily_agg",
+        ["ticker", "date", "sentiment_avg", "article_count",
+         "positive_count", "neutral_count", "negative_count"],
+        [
+            (
+                ticker,
+                row["date"],
+                float(row["sentiment_avg"]) if row["sentiment_avg"] else 0,
+                row["article_count"],
+                row["positive_count"],
+                row["neutral_count"],
+                row["negative_count"],
+            )
+            for row in rows
+        ],
+        conflict_columns=["ticker", "date"],
+    )
 
     return {"count": count}
 
 
 def compute_metrics_windowed(ticker: str, window_days: int, days: int) -> dict:
     """Compute rolling window metrics."""
-    import numpy as np
-    from datetime import date, timedelta
-
-    cutoff_date = date.today() - timedelta(days=days)
-
-    # Get daily_agg data
-    sentiments = fetch_all("""
-        SELECT date, sentiment_avg
-        FROM daily_agg
-        WHERE ticker = %s AND date >= %s
-        ORDER BY date
-    """, (ticker, cutoff_date))
-
-    # Get prices with returns
-    prices = fetch_all("""
-        SELECT date, return_1d
-        FROM prices_daily
-        WHERE ticker = %s AND return_1d IS NOT NULL AND date >= %s
-        ORDER BY date
-    """, (ticker, cutoff_date))
-
-    if not sentiments or not prices:
-        return {"count": 0}
+    return compute_metrics_multi(ticker, [window_days], days)[f"window_{window_days}"]
 
-    # Build lookup dicts
-    sentiment_by_date = {str(s["date"]): s["sentiment_avg"] for s in sentiments}
-    return_by_date = {str(p["date"]): p["return_1d"] for p in prices}
 
-    # Get all dates we have both sentiment and returns
-    common_dates = sorted(set(sentiment_by_date.keys()) & set(return_by_date.keys()))
-
-    if len(common_dates) < window_days:
-        return {"count": 0}
-
-    count = 0
-    for i in range(window_days - 1, len(common_dates)):
-        window_dates = common_dates[i - window_days + 1 : i + 1]
-        date_end = window_dates[-1]
-
-        sentiments_window = [sentiment_by_date[d] for d in window_dates]
-        returns_window = [return_by_date[d] for d in window_dates]
-
-        # Compute metrics
-        metrics = _compute_window_metrics(sentiments_window, returns_window)
-
-        # Upsert
-        execute("""
-            INSERT INTO metrics_windowed
-                (ticker, date_end, window_days, corr, directional_match,
-                 alignment_score, misalignment_days, interpretation)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (ticker, date_end, window_days) DO UPDATE SET
-                corr = EXCLUDED.corr,
-                directional_match = EXCLUDED.directional_match,
-                alignment_score = EXCLUDED.alignment_score,
-                misalignment_days = EXCLUDED.misalignment_days,
-                interpretation = EXCLUDED.interpretation
-        """, (
-            ticker,
-            date_end,
-            window_days,
-            metrics["corr"],
-            metrics["directional_match"],
-            metrics["alignment_score"],
-            metrics["misalignment_days"],
-            metrics["interpretation"],
-        ))
-        count += 1
-
-    return {"count": count}
+def compute_metrics_multi(ticker: str, window_days_list: list[int], days: int) -> dict:
+    """
+    Compute rolling window metrics for several window sizes in one pass.
 
+    The aligned sentiment/return series is loaded once, every window size
+    is computed from the same prefix sums, and all rows are written in one
+    bulk upsert.
 
-def _compute_window_metrics(sentiments: list, returns: list) -> dict:
-    """Compute metrics for a single window."""
-    import numpy as np
+    Returns:
+        {"window_<n>": {"count": rows}} per window size
+    """
+    from datetime import date, timedelta
+    from compute.rolling import METRICS_COLUMNS, metrics_rows
 
-    sentiments = np.array(sentiments, dtype=float)
-    returns = np.array(returns, dtype=float)
+    cutoff_date = date.today() - timedelta(days=days)
+    counts = {wd: 0 for wd in window_days_list}
+
+    # Days with both a sentiment aggregate and a return
+    series = fetch_all("""
+        SELECT d.date, d.sentiment_avg, p.return_1d
+        FROM daily_agg d
+        JOIN prices_daily p ON p.ticker = d.ticker AND p.date = d.date
+        WHERE d.ticker = %s AND d.date >= %s AND p.return_1d IS NOT NULL
+        ORDER BY d.date
+    """, (ticker, cutoff_date))
 
-    # Correlation
-    if np.std(sentiments) < 0.001 or np.std(returns) < 0.001:
-        corr = 0.0
-    else:
-        corr = float(np.corrcoef(sentiments, returns)[0, 1])
-        if np.isnan(corr):
-            corr = 0.0
-
-    # Directional match
-    sent_signs = np.sign(sentiments)
-    ret_signs = np.sign(returns)
-    matches = np.sum(sent_signs == ret_signs)
-    directional_match = float(matches / len(sentiments))
-
-    # Misalignment days
-    misalignment_days = int(len(sentiments) - matches)
-
-    # Alignment score
-    alignment_score = 0.5 * corr + 0.5 * (directional_match * 2 - 1)
-    alignment_score = max(-1.0, min(1.0, alignment_score))
-
-    # Interpretation
-    if alignment_score >= 0.3:
-        interpretation = "Aligned"
-    elif alignment_score <= -0.3:
-        interpretation = "Misleading"
-    else:
-        interpretation = "Noisy"
+    rows = metrics_rows(
+        ticker,
+        [str(row["date"]) for row in series],
+        [row["sentiment_avg"] for row in series],
+        [row["return_1d"] for row in series],
+        list(counts),
+    )
+    copy_upsert(
+        "metrics_windowed",
+        METRICS_COLUMNS,
+        rows,
+        conflict_columns=["ticker", "date_end", "window_days"],
+    )
 
-    return {
-        "corr": float(round(corr, 4)),
-        "directional_match": float(round(directional_match, 4)),
-        "alignment_score": float(round(alignment_score, 4)),
-        "misalignment_days": int(misalignment_days),
-        "interpretation": interpretation,
-    }
+    for row in rows:
+        counts[row[2]] += 1
+    return {f"window_{wd}": {"count": count} for wd, count in counts.items()}
@@ -1,6 +1,235 @@
-"""Fetch news headlines - minimal stub for hackathon."""
-from datetime import datetime, timedelta
+"""
+News providers.
+
+Every provider returns the same shape, so the pipeline can mix sources:
+
+    {"articles": [...], "complete": bool, "requests": int,
+     "newest_published_at": str | None, "oldest_published_at": str | None}
+
+where each article is a dict with url, headline, source, published_at,
+snippet and the price fields added by ingest_news.annotate_prices().
+
+Providers (NEWS_PROVIDERS, comma-separated, default "newsapi"):
+- newsapi: NewsAPI /v2/everything, paginated within the request budget
+- rss: RSS/Atom feeds from NEWS_RSS_URLS ("{ticker}" is substituted)
+- replay: recorded JSONL from NEWS_REPLAY_PATH (file or directory), for
+  offline load tests; timestamps are shifted so the newest record is now
+- mock: generated headlines (demo data)
+
+Record a replay file (from jobs/):
+  python providers/news.py record <TICKER> <out.jsonl> [provider] [hours]
+"""
+import os
+import json
 import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+NEWS_PROVIDERS = [
+    p.strip() for p in os.getenv("NEWS_PROVIDERS", "newsapi").split(",") if p.strip()
+]
+
+DEFAULT_RSS_URLS = (
+    "https://feeds.finance.yahoo.com/rss/2.0/headline?s={ticker}&region=US&lang=en-US,"
+    "https://news.google.com/rss/search?q={ticker}+stock&hl=en-US&gl=US&ceid=US:en"
+)
+RSS_URLS = [u.strip() for u in os.getenv("NEWS_RSS_URLS", DEFAULT_RSS_URLS).split(",") if u.strip()]
+RSS_TIMEOUT = 10
+
+REPLAY_PATH = os.getenv("NEWS_REPLAY_PATH", "")
+
+
+def _result(articles: list[dict], complete: bool = True, requests: int = 0) -> dict:
+    published = [a["published_at"] for a in articles if a.get("published_at")]
+    return {
+        "articles": articles,
+        "complete": complete,
+        "requests": requests,
+        "newest_published_at": max(published) if published else None,
+        "oldest_published_at": min(published) if published else None,
+    }
+
+
+def fetch_newsapi(
+    ticker: str, hours: int, since: datetime = None, max_requests: int = None, until: datetime = None,
+) -> dict:
+    """NewsAPI articles (see ingest_news.fetch_news_pages)."""
+    from ingest_news import fetch_news_pages
+    return fetch_news_pages(ticker, hours=hours, since=since, max_requests=max_requests, until=until)
+
+
+def fetch_rss(
+    ticker: str, hours: int, since: datetime = None, max_requests: int = None, until: datetime = None,
+) -> dict:
+    """Articles from the RSS_URLS feeds published within the last `hours`."""
+    import feedparser
+    import requests
+    from ingest_news import annotate_prices
+
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+    if since and since > cutoff:
+        cutoff = since
+
+    articles = []
+    complete = True
+    for template in RSS_URLS:
+        url = template.format(ticker=ticker)
+        try:
+            response = requests.get(url, timeout=RSS_TIMEOUT)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching RSS feed {url}: {e}")
+            complete = False
+            continue
+
+        feed = feedparser.parse(response.content)
+        feed_title = feed.feed.get("title", "RSS")
+
+        for entry in feed.entries:
+            published = entry.get("published_parsed") or entry.get("updated_parsed")
+            if not entry.get("link") or not published:
+                continue
+            published_at = datetime(*published[:6], tzinfo=timezone.utc)
+            if published_at < cutoff or (until and published_at > until):
+                continue
+
+            articles.append({
+                "url": entry.get("link"),
+                "headline": entry.get("title", ""),
+                "source": entry.get("source", {}).get("title") or feed_title,
+                "published_at": published_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "snippet": entry.get("summary", ""),
+                "stock_symbol": ticker,
+            })
+
+    annotate_prices(ticker, articles)
+    return _result(articles, complete=complete, requests=len(RSS_URLS))
+
+
+def _replay_files(path: str) -> list[Path]:
+    root = Path(path)
+    if root.is_dir():
+        return sorted(root.glob("*.jsonl"))
+    return [root] if root.exists() else []
+
+
+def fetch_replay(
+    ticker: str, hours: int, since: datetime = None, max_requests: int = None, until: datetime = None,
+) -> dict:
+    """
+    Recorded articles for ticker from NEWS_REPLAY_PATH.
+
+    Records are JSON lines in the article shape (records without a ticker /
+    stock_symbol apply to every ticker). All timestamps are shifted by the
+    same offset so the newest record in the recording is "now", then the
+    usual `hours` window is applied.
+    """
+    files = _replay_files(REPLAY_PATH)
+    if not files:
+        print(f"No replay recordings found at {REPLAY_PATH!r} (set NEWS_REPLAY_PATH)")
+        return _result([], complete=False)
+
+    records = []
+    for path in files:
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    records.append(json.loads(line))
+
+    def parse(ts: str) -> datetime:
+        return datetime.fromisoformat(ts.replace("Z", "+00:00"))
+
+    dated = [r for r in records if r.get("published_at") and r.get("url")]
+    if not dated:
+        return _result([])
+    shift = datetime.now(timezone.utc) - max(parse(r["published_at"]) for r in dated)
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+
+    articles = []
+    for record in dated:
+        record_ticker = (record.get("stock_symbol") or record.get("ticker") or ticker).upper()
+        if record_ticker != ticker.upper():
+            continue
+
+        published_at = parse(record["published_at"]) + shift
+        if published_at < cutoff or (until and published_at > until):
+            continue
+
+        published = published_at.strftime("%Y-%m-%dT%H:%M:%SZ")
+        articles.append({
+            "url": record["url"],
+            "headline": record.get("headline") or record.get("title", ""),
+            "source": record.get("source") or "Replay",
+            "published_at": published,
+            "snippet": record.get("snippet", ""),
+            "stock_symbol": ticker,
+            "price": record.get("price"),
+            "price_timestamp": published,
+            "price_change": record.get("price_change"),
+            "price_direction": record.get("price_direction", "unknown"),
+        })
+
+    return _result(articles)
+
+
+def fetch_mock(
+    ticker: str, hours: int, since: datetime = None, max_requests: int = None, until: datetime = None,
+) -> dict:
+    """Generated demo headlines in the provider article shape."""
+    articles = [
+        {
+            "url": h["url"],
+            "headline": h["title"],
+            "source": h["source"],
+            "source_id": h["source_id"],
+            "published_at": h["published_at"],
+            "snippet": h["snippet"],
+            "stock_symbol": ticker,
+            "price": None,
+            "price_timestamp": h["published_at"],
+            "price_change": None,
+            "price_direction": "unknown",
+        }
+        for h in fetch_headlines(ticker, days=max(1, hours // 24))
+    ]
+    return _result(articles)
+
+
+PROVIDERS = {
+    "newsapi": fetch_newsapi,
+    "rss": fetch_rss,
+    "replay": fetch_replay,
+    "mock": fetch_mock,
+}
+
+
+def fetch_news(
+    provider: str,
+    ticker: str,
+    hours: int,
+    since: datetime = None,
+    max_requests: int = None,
+    until: datetime = None,
+) -> dict:
+    """
+    Fetch articles for ticker from one provider by name.
+
+    since / until bound published_at (until resumes a fetch that stopped
+    early, below the oldest article it read).
+    """
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown news provider: {provider} (expected one of {tuple(PROVIDERS)})")
+    return PROVIDERS[provider](ticker, hours, since=since, max_requests=max_requests, until=until)
+
+
+def record_jsonl(path: str, articles: list[dict]) -> int:
+    """Append articles to a JSONL recording for the replay provider."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        for article in articles:
+            f.write(json.dumps(article, default=str) + "\n")
+    return len(articles)
+
 
 def fetch_headlines(ticker: str, days: int = 7, since_ts: datetime = None) -> list[dict]:
     """
@@ -67,3 +296,20 @@ def _generate_mock_headlines(ticker: str, days: int) -> list[dict]:
         })
 
     return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 4 or sys.argv[1] != "record":
+        print(__doc__)
+        sys.exit(1)
+
+    ticker = sys.argv[2].upper()
+    out_path = sys.argv[3]
+    provider = sys.argv[4] if len(sys.argv) > 4 else NEWS_PROVIDERS[0]
+    hours = int(sys.argv[5]) if len(sys.argv) > 5 else 168
+
+    result = fetch_news(provider, ticker, hours)
+    count = record_jsonl(out_path, result["articles"])
+    print(f"Recorded {count} {provider} articles for {ticker} to {out_path}")
@@ -0,0 +1,120 @@
+"""
+Daily close lookup for annotating articles with the price on their publish date.
+
+A PriceLookup loads one date range per ticker (prices_daily first, one
+price history download if the DB does not cover the range, or for the days
+after its last stored close) and answers every article from memory. Create one per ingestion run so closes never go stale.
+"""
+from datetime import date, timedelta
+import bisect
+from providers.prices import download_frames
+
+# Calendar days before the earliest article to load, so the previous
+# trading day's close is available across weekends and holidays
+LOOKBACK_DAYS = 7
+
+# prices_daily is treated as covering the start of the range if its rows
+# start within this many calendar days of it (weekends, holidays)
+COVERAGE_SLACK_DAYS = 3
+
+
+def last_weekday(day: date) -> date:
+    """Latest Monday-Friday date on or before day."""
+    return day - timedelta(days=max(0, day.weekday() - 4))
+
+
+class PriceLookup:
+    """Memoized daily closes for one ticker."""
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker.upper()
+        self.closes: dict[date, float] = {}
+        self._dates: list[date] = []
+        self._loaded: tuple[date, date] | None = None
+
+    def load(self, start: date, end: date) -> int:
+        """
+        Make closes for [start - LOOKBACK_DAYS, end] available.
+
+        No-op if the range is already loaded. Returns the number of closes held.
+        """
+        start = start - timedelta(days=LOOKBACK_DAYS)
+        if self._loaded and self._loaded[0] <= start and end <= self._loaded[1]:
+            return len(self.closes)
+        if self._loaded:
+            start, end = min(start, self._loaded[0]), max(end, self._loaded[1])
+
+        closes = self._load_from_db(start, end)
+        if not closes or min(closes) > start + timedelta(days=COVERAGE_SLACK_DAYS):
+            closes.update(self._load_from_yfinance(start, end))
+        elif max(closes) < last_weekday(end):
+            # Stored prices end before the last possible bar (prices are
+            # ingested after news): top up the days after them
+            closes.update(self._load_from_yfinance(max(closes) + timedelta(days=1), end))
+
+        self.closes = closes
+        self._dates = sorted(closes)
+        self._loaded = (start, end)
+        return len(closes)
+
+    def annotate(self, day: date) -> dict:
+        """
+        Price fields for an article published on `day`.
+
+        Returns dict with price (close on that day, None if it was not a
+        trading day), price_change (vs the previous trading day's close)
+        and price_direction ('up', 'down', 'neutral' or 'unknown').
+        """
+        self.load(day, day)
+
+        result = {"price": None, "price_change": None, "price_direction": "unknown"}
+        if day not in self.closes:
+            return result
+
+        price = round(self.closes[day], 2)
+        result["price"] = price
+
+        idx = bisect.bisect_left(self._dates, day)
+        if idx > 0:
+            price_change = round(price - self.closes[self._dates[idx - 1]], 2)
+            result["price_change"] = price_change
+            if price_change > 0:
+                result["price_direction"] = "up"
+            elif price_change < 0:
+                result["price_direction"] = "down"
+            else:
+                result["price_direction"] = "neutral"
+
+        return result
+
+    def _load_from_db(self, start: date, end: date) -> dict[date, float]:
+        """Closes stored in prices_daily (empty if the DB is unavailable)."""
+        try:
+            from db import fetch_all, is_configured
+            if not is_configured():
+                return {}
+            rows = fetch_all("""
+                SELECT date, close FROM prices_daily
+                WHERE ticker = %s AND date BETWEEN %s AND %s
+            """, (self.ticker, start, end))
+        except Exception as e:
+            print(f"Could not read stored prices for {self.ticker}: {e}")
+            return {}
+
+        return {row["date"]: float(row["close"]) for row in rows}
+
+    def _load_from_yfinance(self, start: date, end: date) -> dict[date, float]:
+        """Closes from one price history download covering the whole range."""
+        try:
+            frames = download_frames(
+                [self.ticker],
+                start=start.isoformat(),
+                end=(end + timedelta(days=1)).isoformat(),  # end is exclusive
+            )
+        except Exception as e:
+            print(f"Error fetching price history for {self.ticker}: {e}")
+            return {}
+
+        if self.ticker not in frames:
+            return {}
+        return {ts.date(): float(close) for ts, close in frames[self.ticker]["Close"].items()}
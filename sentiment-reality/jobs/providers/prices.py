@@ -1,38 +1,241 @@
-"""Fetch daily prices using yfinance."""
+"""
+Fetch daily and current prices using yfinance.
+
+Prices for many tickers are fetched with one multi-symbol yf.download()
+call per PRICE_BATCH_SIZE tickers, and the resulting frame is split per
+ticker with vectorized column conversion into NumPy arrays.
+
+Jobs that process a list of tickers call prefetch_daily_prices() once up
+front; fetch_daily_prices() then serves each ticker from that download
+instead of making its own request.
+
+With PRICES_BASE_URL set, daily bars come from that server's /v1/history
+route (see fixture_server.py) instead of Yahoo, for offline load tests.
+"""
+import os
+import numpy as np
+import pandas as pd
+import requests
 import yfinance as yf
 from datetime import datetime, timedelta
 
-def fetch_daily_prices(ticker: str, days: int = 90) -> list[dict]:
+PRICES_BASE_URL = os.getenv("PRICES_BASE_URL", "").rstrip("/")
+PRICES_TIMEOUT = 30
+
+# Tickers per multi-symbol download
+PRICE_BATCH_SIZE = 50
+
+PRICE_COLUMNS = ("date", "open", "high", "low", "close", "adj_close", "volume")
+
+# ticker -> (days, columns) from the last prefetch_daily_prices() call
+_prefetched: dict[str, tuple[int, dict[str, np.ndarray]]] = {}
+
+
+def _batches(tickers: list[str]) -> list[list[str]]:
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    return [tickers[i:i + PRICE_BATCH_SIZE] for i in range(0, len(tickers), PRICE_BATCH_SIZE)]
+
+
+def _download_from_server(tickers: list[str], **kwargs) -> dict[str, pd.DataFrame]:
+    """Daily bars per ticker from PRICES_BASE_URL (yfinance column names)."""
+    params = {"symbols": ",".join(tickers)}
+    params.update({k: v for k, v in kwargs.items() if k in ("start", "end", "period")})
+    response = requests.get(f"{PRICES_BASE_URL}/v1/history", params=params, timeout=PRICES_TIMEOUT)
+    response.raise_for_status()
+
+    frames = {}
+    for ticker, history in response.json().items():
+        dates = pd.DatetimeIndex(history.pop("date"))
+        frames[ticker] = pd.DataFrame(history, index=dates)
+    return frames
+
+
+def download_frames(tickers: list[str], **kwargs) -> dict[str, pd.DataFrame]:
     """
-    Fetch daily price data for a ticker using yfinance.
+    One multi-symbol download, split into a frame per ticker (rows without
+    a close dropped). kwargs are yf.download() range arguments (start/end
+    or period, interval).
+    """
+    if PRICES_BASE_URL:
+        frames = _download_from_server(tickers, **kwargs)
+    else:
+        df = yf.download(
+            tickers,
+            group_by="ticker",
+            auto_adjust=True,
+            progress=False,
+            threads=True,
+            **kwargs,
+        )
+        if df is None or df.empty:
+            return {}
+        if isinstance(df.columns, pd.MultiIndex):
+            level = df.columns.get_level_values(0)
+            frames = {t: df[t] for t in tickers if t in level}
+        else:
+            frames = {tickers[0]: df}
+
+    frames = {ticker: frame.dropna(subset=["Close"]) for ticker, frame in frames.items()}
+    return {ticker: frame for ticker, frame in frames.items() if not frame.empty}
+
+
+def _frame_to_columns(frame: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Price columns as arrays (no per-row Python); missing or zero values are NaN."""
+    index = frame.index.tz_localize(None) if frame.index.tz is not None else frame.index
+    close = frame["Close"].to_numpy(dtype=float)
+    columns = {"date": index.to_numpy().astype("datetime64[D]")}
+    for name in ("Open", "High", "Low"):
+        values = frame[name].to_numpy(dtype=float)
+        columns[name.lower()] = np.where(values == 0, np.nan, values)
+    columns["close"] = close
+    columns["adj_close"] = close  # auto_adjust=True: closes are already adjusted
+    volume = frame["Volume"].to_numpy(dtype=float)
+    columns["volume"] = np.where(volume == 0, np.nan, volume)
+    return columns
+
+
+def empty_columns() -> dict[str, np.ndarray]:
+    """Price columns with no rows."""
+    columns = {name: np.empty(0) for name in PRICE_COLUMNS}
+    columns["date"] = np.empty(0, dtype="datetime64[D]")
+    return columns
+
+
+def tail(columns: dict[str, np.ndarray], n: int) -> dict[str, np.ndarray]:
+    """Last n rows of price columns."""
+    return {name: values[-n:] for name, values in columns.items()}
+
+
+def daily_returns(close: np.ndarray, prior_close: float | None = None) -> np.ndarray:
+    """
+    Percent change of each close vs the previous one (NaN where unknown).
+
+    prior_close is the stored close before close[0]; without it the first
+    return is NaN.
+    """
+    previous = np.empty_like(close)
+    previous[0] = np.nan if prior_close is None else prior_close
+    previous[1:] = close[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = (close - previous) / previous * 100
+    returns[~np.isfinite(returns)] = np.nan
+    return returns
+
+
+def to_rows(columns: dict[str, np.ndarray], names: tuple[str, ...] = PRICE_COLUMNS) -> list[tuple]:
+    """
+    Price columns as tuples of Python values in `names` order (NaN as
+    None, volume as int), for database writes.
+    """
+    if not len(columns["date"]):
+        return []
+    values = []
+    for name in names:
+        column = columns[name]
+        if name == "date":
+            values.append(column.astype(object))
+        elif name == "volume":
+            values.append(np.where(
+                np.isnan(column), None, np.nan_to_num(column).astype(np.int64).astype(object)
+            ))
+        else:
+            values.append(np.where(np.isnan(column), None, column.astype(object)))
+    return list(zip(*(v.tolist() for v in values)))
+
 
-    Returns list of dicts with: date, open, high, low, close, adj_close, volume
+def fetch_daily_prices_bulk(tickers: list[str], days: int = 90) -> dict[str, dict[str, np.ndarray]]:
+    """
+    Fetch daily price data for many tickers.
+
+    Returns dict of ticker -> price columns (see fetch_daily_prices);
+    tickers without data are omitted.
     """
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days + 5)  # Buffer for weekends/holidays
 
-    try:
-        stock = yf.Ticker(ticker)
-        df = stock.history(start=start_date.strftime("%Y-%m-%d"), end=end_date.strftime("%Y-%m-%d"))
-
-        if df.empty:
-            print(f"No price data found for {ticker}")
-            return []
-
-        results = []
-        for date_idx, row in df.iterrows():
-            results.append({
-                "date": date_idx.strftime("%Y-%m-%d"),
-                "open": float(row["Open"]) if row["Open"] else None,
-                "high": float(row["High"]) if row["High"] else None,
-                "low": float(row["Low"]) if row["Low"] else None,
-                "close": float(row["Close"]),
-                "adj_close": float(row["Close"]),  # yfinance returns adjusted by default
-                "volume": int(row["Volume"]) if row["Volume"] else None,
-            })
-
-        return results[-days:]  # Return only requested days
-
-    except Exception as e:
-        print(f"Error fetching prices for {ticker}: {e}")
-        return []
+    results = {}
+    for batch in _batches(tickers):
+        try:
+            frames = download_frames(
+                batch,
+                start=start_date.strftime("%Y-%m-%d"),
+                end=end_date.strftime("%Y-%m-%d"),
+            )
+        except Exception as e:
+            print(f"Error fetching prices for {', '.join(batch)}: {e}")
+            continue
+
+        for ticker, frame in frames.items():
+            results[ticker] = tail(_frame_to_columns(frame), days)  # Return only requested days
+
+    missing = [t for batch in _batches(tickers) for t in batch if t not in results]
+    if missing:
+        print(f"No price data found for {', '.join(missing)}")
+    return results
+
+
+def prefetch_daily_prices(tickers: list[str], days: int = 90) -> int:
+    """Download daily prices for tickers in bulk for later fetch_daily_prices() calls."""
+    _prefetched.clear()
+    for ticker, columns in fetch_daily_prices_bulk(tickers, days=days).items():
+        _prefetched[ticker] = (days, columns)
+    return len(_prefetched)
+
+
+def fetch_daily_prices(ticker: str, days: int = 90) -> dict[str, np.ndarray]:
+    """
+    Fetch daily price data for a ticker using yfinance.
+
+    Served from the last prefetch_daily_prices() call when it covered this
+    ticker and range (each prefetched ticker is used once).
+
+    Returns dict of equal-length arrays keyed by PRICE_COLUMNS: date
+    (datetime64[D]), open, high, low, close, adj_close, volume (float64,
+    NaN where missing). Use to_rows() for database writes.
+    """
+    ticker = ticker.upper()
+    cached = _prefetched.pop(ticker, None)
+    if cached and cached[0] >= days:
+        return tail(cached[1], days)
+
+    return fetch_daily_prices_bulk([ticker], days=days).get(ticker, empty_columns())
+
+
+def fetch_current_prices(tickers: list[str]) -> dict[str, dict]:
+    """
+    Latest price for many tickers, from the last few daily bars.
+
+    The last bar's close is the latest traded price during market hours
+    (the close otherwise); the change is against the bar before it.
+
+    Returns dict of ticker -> {price, price_change, price_direction}
+    (tickers without data are omitted).
+    """
+    results = {}
+    for batch in _batches(tickers):
+        try:
+            frames = download_frames(batch, period="5d", interval="1d")
+        except Exception as e:
+            print(f"  Error fetching current prices for {', '.join(batch)}: {e}")
+            continue
+
+        for ticker, frame in frames.items():
+            closes = frame["Close"].to_numpy(dtype=float)
+            price = round(float(closes[-1]), 2)
+
+            price_change = None
+            price_direction = "neutral"
+            if len(closes) > 1:
+                price_change = round(float(closes[-1] - closes[-2]), 2)
+                if price_change > 0:
+                    price_direction = "up"
+                elif price_change < 0:
+                    price_direction = "down"
+
+            results[ticker] = {
+                "price": price,
+                "price_change": price_change,
+                "price_direction": price_direction,
+            }
+
+    return results
@@ -0,0 +1,291 @@
+"""
+Bulk re-scoring of historical items under a new model key.
+
+Streams every item through the model this process loads
+(SENTIMENT_MODEL_NAME) in pages of RESCORE_PAGE_SIZE items, in item id
+order, and writes item_scores under the new key. After each page the
+position is checkpointed in rescore_runs, so an interrupted run resumes
+where it stopped. Read paths keep using the active key throughout; once
+every item is covered, daily aggregates are recomputed from the new scores
+and then the new key is activated in one transaction. Scoring always uses
+the local model, never SENTIMENT_SERVICE_URL (which serves the old one).
+
+Usage (from jobs/):
+  SENTIMENT_MODEL_NAME=<hf model id> python rescore_history.py <model_key> [options]
+
+Options:
+  --tier full|headline   Text to score (default: full)
+  --processes N          Scoring processes (default: SCORE_PROCESSES)
+  --page-size N          Items per checkpointed page (default: 1000)
+  --no-activate          Re-score only, leave the active key unchanged
+  --activate-only        Activate an already re-scored key and refresh aggregates
+"""
+import multiprocessing
+import os
+from db import fetch_all, execute, is_configured, transaction
+from ml.sentiment import MODEL_NAME
+from model_keys import activate_model, get_model_name, register_model
+from score_unscored_items import (
+    DEFAULT_PROCESSES,
+    ITEM_BATCH_SIZE,
+    TIERS,
+    _init_scoring_process,
+    _score_item_batch,
+    _write_scores,
+    resolve_tier_keys,
+)
+
+RESCORE_PAGE_SIZE = 1000
+
+
+def _start_run(model_key: str, tier: str) -> dict:
+    """Resume the latest unfinished run for this key and tier, or start a new one."""
+    with transaction() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                UPDATE rescore_runs
+                SET status = 'RUNNING', updated_at = now()
+                WHERE id = (
+                    SELECT id FROM rescore_runs
+                    WHERE model_key = %s AND tier = %s AND status <> 'DONE'
+                    ORDER BY id DESC
+                    LIMIT 1
+                )
+                RETURNING id, last_item_id, items_seen, items_scored, errors, started_at
+            """, (model_key, tier))
+            row = cur.fetchone()
+
+            if row is None:
+                cur.execute("""
+                    INSERT INTO rescore_runs (model_key, tier)
+                    VALUES (%s, %s)
+                    RETURNING id, last_item_id, items_seen, items_scored, errors, started_at
+                """, (model_key, tier))
+                row = cur.fetchone()
+
+    columns = ("id", "last_item_id", "items_seen", "items_scored", "errors", "started_at")
+    return dict(zip(columns, row))
+
+
+def _checkpoint(run: dict, status: str = "RUNNING") -> None:
+    """Persist the run's position and counters."""
+    execute("""
+        UPDATE rescore_runs
+        SET last_item_id = %s,
+            items_seen = %s,
+            items_scored = %s,
+            errors = %s,
+            status = %s,
+            updated_at = now(),
+            finished_at = CASE WHEN %s = 'DONE' THEN now() ELSE NULL END
+        WHERE id = %s
+    """, (
+        run["last_item_id"],
+        run["items_seen"],
+        run["items_scored"],
+        run["errors"],
+        status,
+        status,
+        run["id"],
+    ))
+
+
+def _fetch_page(write_key: str, after_id, page_size: int, created_since=None) -> list[dict]:
+    """Next page of items (id order) without a score under write_key."""
+    return fetch_all("""
+        SELECT i.id, i.url, i.title, i.snippet
+        FROM items i
+        WHERE (%s::uuid IS NULL OR i.id > %s::uuid)
+            AND (%s::timestamptz IS NULL OR i.created_at >= %s::timestamptz)
+            AND NOT EXISTS (
+                SELECT 1 FROM item_scores s
+                WHERE s.item_id = i.id AND s.model = %s
+            )
+        ORDER BY i.id
+        LIMIT %s
+    """, (after_id, after_id, created_since, created_since, write_key, page_size))
+
+
+def refresh_aggregates(model_key: str | None = None) -> dict:
+    """
+    Recompute daily aggregates and metrics for every active ticker from the
+    scores under model_key (default: the active model key).
+    """
+    from compute.aggregate_daily import compute_daily_aggregates
+    from pipeline import compute_metrics_windowed
+    from worker import DAILY_PARAMS
+
+    tickers = [
+        row["ticker"] for row in fetch_all(
+            "SELECT ticker FROM tracked_stocks WHERE is_active = true ORDER BY ticker"
+        )
+    ]
+
+    results = {}
+    for ticker in tickers:
+        try:
+            days = compute_daily_aggregates(ticker, model_key)
+            compute_metrics_windowed(
+                ticker,
+                window_days=DAILY_PARAMS["window_days"],
+                days=DAILY_PARAMS["metrics_days"],
+            )
+            results[ticker] = {"success": True, "days": days}
+        except Exception as e:
+            print(f"  Error refreshing aggregates for {ticker}: {e}")
+            results[ticker] = {"success": False, "error": str(e)}
+
+    return results
+
+
+def rescore_history(
+    model_key: str,
+    tier: str = "full",
+    page_size: int = RESCORE_PAGE_SIZE,
+    processes: int | None = None,
+    activate: bool = True,
+) -> dict:
+    """
+    Re-score every item under model_key, then (optionally) activate it.
+
+    Args:
+        model_key: New key for item_scores.model (registered to MODEL_NAME)
+        tier: "full" (article text) or "headline" (title + snippet)
+        page_size: Items fetched and checkpointed per page
+        processes: Scoring processes (default SCORE_PROCESSES)
+        activate: Switch the read path to model_key when done
+
+    Returns:
+        Summary dict with run_id, model_key, tier, items_seen, items_scored,
+        errors, activated
+    """
+    if tier not in TIERS:
+        raise ValueError(f"Unknown scoring tier: {tier} (expected one of {TIERS})")
+
+    summary = {
+        "run_id": None,
+        "model_key": model_key,
+        "tier": tier,
+        "items_seen": 0,
+        "items_scored": 0,
+        "errors": 0,
+        "activated": False,
+    }
+
+    if not is_configured():
+        print("ERROR: Database not configured. Set DATABASE_URL in .env")
+        return summary
+
+    register_model(model_key, MODEL_NAME)
+    write_key, _ = resolve_tier_keys(tier, model_key)
+
+    run = _start_run(model_key, tier)
+    summary["run_id"] = run["id"]
+    resumed = " (resuming)" if run["last_item_id"] else ""
+    print(f"Re-scoring history as {write_key} with {MODEL_NAME}{resumed}")
+
+    processes = processes or DEFAULT_PROCESSES
+    pool = None
+    if processes > 1:
+        threads = max(1, (os.cpu_count() or 1) // processes)
+        print(f"Scoring with {processes} processes x {threads} threads")
+        # spawn: forking after torch has started its thread pools can deadlock
+        ctx = multiprocessing.get_context("spawn")
+        pool = ctx.Pool(processes, initializer=_init_scoring_process, initargs=(threads,))
+
+    def score_pass(created_since=None):
+        while True:
+            page = _fetch_page(write_key, run["last_item_id"], page_size, created_since)
+            if not page:
+                return
+
+            batches = [
+                (run["items_seen"] + start, run["items_seen"] + len(page),
+                 page[start:start + ITEM_BATCH_SIZE], tier, write_key, True)
+                for start in range(0, len(page), ITEM_BATCH_SIZE)
+            ]
+            outcomes = pool.imap_unordered(_score_item_batch, batches) if pool else map(_score_item_batch, batches)
+
+            for outcome in outcomes:
+                run["errors"] += outcome["errors"]
+                _write_scores(outcome["scores"], write_key)
+                run["items_scored"] += len(outcome["scores"])
+
+            run["items_seen"] += len(page)
+            run["last_item_id"] = str(page[-1]["id"])
+            _checkpoint(run)
+            print(f"  Checkpoint: {run['items_seen']} items seen, {run['items_scored']} scored")
+
+    try:
+        score_pass()
+
+        # Catch up on items ingested (with ids behind the cursor) during the run
+        run["last_item_id"] = None
+        score_pass(created_since=run["started_at"])
+
+        _checkpoint(run, status="DONE")
+    except BaseException:
+        _checkpoint(run, status="ERROR")
+        raise
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    summary["items_seen"] = run["items_seen"]
+    summary["items_scored"] = run["items_scored"]
+    summary["errors"] = run["errors"]
+
+    if activate:
+        # Aggregates first, so the read path never pairs the new key with
+        # aggregates built from the old one
+        print(f"Refreshing aggregates from {model_key}...")
+        refresh_aggregates(model_key)
+        print(f"Activating {model_key}...")
+        activate_model(model_key)
+        summary["activated"] = True
+
+    return summary
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    if not args or args[0].startswith("--"):
+        print(__doc__)
+        sys.exit(1)
+
+    model_key = args[0]
+
+    def option(name: str, default=None):
+        if name in args:
+            return args[args.index(name) + 1]
+        return default
+
+    if "--activate-only" in args:
+        print(f"\n=== Activating {model_key} ===\n")
+        if get_model_name(model_key) is None:
+            print(f"ERROR: Model key {model_key} is not registered")
+            sys.exit(1)
+        refresh_aggregates(model_key)
+        activate_model(model_key)
+        print(f"\n{model_key} is now the active model key\n")
+        sys.exit(0)
+
+    print(f"\n=== Re-scoring history as {model_key} ===\n")
+    result = rescore_history(
+        model_key,
+        tier=option("--tier", "full"),
+        page_size=int(option("--page-size", RESCORE_PAGE_SIZE)),
+        processes=int(option("--processes", 0)) or None,
+        activate="--no-activate" not in args,
+    )
+
+    print(f"\n=== Summary ===")
+    print(f"  Run: {result['run_id']}")
+    print(f"  Items seen: {result['items_seen']}")
+    print(f"  Scored: {result['items_scored']}")
+    print(f"  Errors: {result['errors']}")
+    print(f"  Activated: {result['activated']}")
+    print()
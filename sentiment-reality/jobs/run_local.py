@@ -7,6 +7,7 @@ Usage:
   python run_local.py refresh TSLA       - Run REFRESH_STOCK logic for TSLA
   python run_local.py worker-once        - Poll and process ONE task from queue
   python run_local.py bootstrap          - Bootstrap default watchlist
+  python run_local.py score-global [N]   - Score up to N unscored items across all tickers
 
 This bypasses the task queue and runs directly, useful for:
 - Testing pipeline changes
@@ -42,6 +43,7 @@ BACKFILL_PARAMS = {
     "agg_days": 30,
     "metrics_days": 30,
     "window_days_list": [7, 14, 30],  # Multiple windows
+    "score_processes": None,  # None = SCORE_PROCESSES env (default 1)
 }
 
 DEFAULT_TICKERS = ["TSLA", "NVDA", "JPM", "PFE", "GME"]
@@ -50,7 +52,7 @@ DEFAULT_TICKERS = ["TSLA", "NVDA", "JPM", "PFE", "GME"]
 def run_daily():
     """Run DAILY_UPDATE_ALL logic - process all active tickers."""
     from db import fetch_all, is_configured
-    from pipeline import run_pipeline_for_ticker
+    from pipeline import prefetch_prices, run_pipeline_for_ticker
 
     if not is_configured():
         print("ERROR: Database not configured. Set DATABASE_URL in .env")
@@ -73,6 +75,8 @@ def run_daily():
 
     print(f"\nActive tickers: {[t['ticker'] for t in tickers]}")
 
+    prefetch_prices([t["ticker"] for t in tickers], DAILY_PARAMS["prices_days"])
+
     results = {}
     for row in tickers:
         ticker = row["ticker"]
@@ -171,7 +175,7 @@ def run_bootstrap():
 def run_backfill_defaults():
     """Run full 30-day backfill for all default tickers."""
     from db import is_configured
-    from pipeline import run_pipeline_for_ticker
+    from pipeline import prefetch_prices, run_pipeline_for_ticker
 
     if not is_configured():
         print("ERROR: Database not configured. Set DATABASE_URL in .env")
@@ -183,6 +187,8 @@ def run_backfill_defaults():
     print(f"Started: {datetime.now().isoformat()}")
     print("=" * 60)
 
+    prefetch_prices(DEFAULT_TICKERS, BACKFILL_PARAMS["prices_days"], full=True)
+
     results = {}
     for ticker in DEFAULT_TICKERS:
         print(f"\n{'='*50}")
@@ -197,6 +203,8 @@ def run_backfill_defaults():
                 agg_days=BACKFILL_PARAMS["agg_days"],
                 metrics_days=BACKFILL_PARAMS["metrics_days"],
                 window_days_list=BACKFILL_PARAMS["window_days_list"],
+                score_processes=BACKFILL_PARAMS["score_processes"],
+                prices_full=True,
             )
             results[ticker] = result["success"]
         except Exception as e:
@@ -216,6 +224,24 @@ def run_backfill_defaults():
     return all(results.values())
 
 
+def run_score_global(limit: int = 500):
+    """Score unscored items across all active tickers, then refresh their aggregates."""
+    from db import is_configured
+    from worker import handle_score_global
+
+    if not is_configured():
+        print("ERROR: Database not configured. Set DATABASE_URL in .env")
+        return False
+
+    print("=" * 60)
+    print(f"LOCAL RUN: SCORE_GLOBAL (limit {limit})")
+    print(f"Started: {datetime.now().isoformat()}")
+    print("=" * 60)
+
+    result = handle_score_global({"payload": {"score_limit": limit}})
+    return result["errors"] == 0
+
+
 def print_usage():
     """Print usage information."""
     print("""
@@ -227,6 +253,7 @@ Commands:
   worker-once        Poll and process ONE task from queue
   bootstrap          Bootstrap default watchlist (TSLA, NVDA, JPM, PFE, GME)
   backfill-defaults  Full 30-day backfill for all default tickers
+  score-global [N]   Score up to N unscored items across all tickers (default 500)
 
 Examples:
   python run_local.py daily
@@ -234,6 +261,7 @@ Examples:
   python run_local.py worker-once
   python run_local.py bootstrap
   python run_local.py backfill-defaults
+  python run_local.py score-global 1000
 """)
 
 
@@ -259,6 +287,9 @@ def main():
         success = run_bootstrap()
     elif command == "backfill-defaults":
         success = run_backfill_defaults()
+    elif command == "score-global":
+        limit = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+        success = run_score_global(limit)
     elif command in ["-h", "--help", "help"]:
         print_usage()
         sys.exit(0)
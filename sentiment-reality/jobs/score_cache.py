@@ -0,0 +1,163 @@
+"""
+Content-hash score cache.
+
+Syndicated wire stories (Reuters, AP, ...) show up under many URLs and
+tickers. Scores are cached by a hash of the normalized article text so
+each distinct text is run through the model once per model key.
+
+Near-duplicate matching (optional, SCORE_CACHE_NEAR_DUP=1) uses MinHash
+signatures over word shingles with LSH banding: candidates sharing any
+band are pulled from the DB and accepted if their estimated Jaccard
+similarity is at least NEAR_DUP_THRESHOLD.
+"""
+import os
+import re
+import hashlib
+import numpy as np
+from db import fetch_all, execute_many
+
+# Near-duplicate matching configuration
+NEAR_DUP_ENABLED = os.getenv("SCORE_CACHE_NEAR_DUP", "0") == "1"
+NEAR_DUP_THRESHOLD = 0.9
+SHINGLE_WORDS = 5
+NUM_PERM = 64
+LSH_BANDS = 16  # 16 bands x 4 rows
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 of the normalized text."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def minhash_signature(text: str) -> list[int]:
+    """MinHash signature (NUM_PERM values) over word shingles of the normalized text."""
+    words = normalize_text(text).split()
+    if len(words) < SHINGLE_WORDS:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [
+            " ".join(words[i:i + SHINGLE_WORDS])
+            for i in range(len(words) - SHINGLE_WORDS + 1)
+        ]
+
+    hashes = np.array(
+        [
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+            for s in set(shingles)
+        ],
+        dtype=np.uint64,
+    )
+
+    # (a * h + b) mod p for every permutation at once, then min per permutation
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME
+    return [int(v) for v in permuted.min(axis=0)]
+
+
+def lsh_bands(signature: list[int]) -> list[str]:
+    """Band keys for LSH candidate lookup (band index + hash of the band's rows)."""
+    rows = len(signature) // LSH_BANDS
+    bands = []
+    for b in range(LSH_BANDS):
+        chunk = ",".join(str(v) for v in signature[b * rows:(b + 1) * rows])
+        digest = hashlib.blake2b(chunk.encode("utf-8"), digest_size=8).hexdigest()
+        bands.append(f"{b}:{digest}")
+    return bands
+
+
+def _estimated_jaccard(sig_a: list[int], sig_b: list[int]) -> float:
+    """Fraction of matching MinHash positions."""
+    if not sig_a or not sig_b or len(sig_a) != len(sig_b):
+        return 0.0
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def lookup_exact(hashes: list[str], model: str) -> dict[str, dict]:
+    """Return cached scores for the given text hashes, keyed by hash."""
+    if not hashes:
+        return {}
+
+    rows = fetch_all("""
+        SELECT text_hash, sentiment_label, sentiment_score, confidence
+        FROM score_cache
+        WHERE model = %s AND text_hash = ANY(%s)
+    """, (model, list(set(hashes))))
+
+    return {row["text_hash"]: row for row in rows}
+
+
+def lookup_near_duplicate(signature: list[int], model: str) -> dict | None:
+    """Return the cached score of the most similar near-duplicate, if any."""
+    candidates = fetch_all("""
+        SELECT text_hash, sentiment_label, sentiment_score, confidence, minhash
+        FROM score_cache
+        WHERE model = %s AND lsh_bands && %s::text[]
+        LIMIT 50
+    """, (model, lsh_bands(signature)))
+
+    best = None
+    best_similarity = NEAR_DUP_THRESHOLD
+    for row in candidates:
+        similarity = _estimated_jaccard(signature, row["minhash"] or [])
+        if similarity >= best_similarity:
+            best, best_similarity = row, similarity
+
+    return best
+
+
+def lookup(texts: list[str], model: str) -> tuple[list[str], list[dict | None]]:
+    """
+    Look up cached scores for a batch of texts.
+
+    Returns (hashes, results) aligned with `texts`; results[i] is None on a miss.
+    """
+    hashes = [text_hash(t) for t in texts]
+    exact = lookup_exact(hashes, model)
+    results = [exact.get(h) for h in hashes]
+
+    if NEAR_DUP_ENABLED:
+        for i, text in enumerate(texts):
+            if results[i] is None:
+                results[i] = lookup_near_duplicate(minhash_signature(text), model)
+
+    return hashes, results
+
+
+def store(entries: list[tuple[str, str, dict]], model: str) -> int:
+    """
+    Store scores in the cache.
+
+    Args:
+        entries: (text_hash, text, result) tuples; result has sentiment_label,
+                 sentiment_score and confidence
+        model: Model key the scores were produced with
+    """
+    rows = []
+    for h, text, result in entries:
+        signature = minhash_signature(text) if NEAR_DUP_ENABLED else None
+        rows.append((
+            h,
+            model,
+            result["sentiment_label"],
+            result["sentiment_score"],
+            result["confidence"],
+            signature,
+            lsh_bands(signature) if signature else None,
+        ))
+
+    return execute_many("""
+        INSERT INTO score_cache
+            (text_hash, model, sentiment_label, sentiment_score, confidence, minhash, lsh_bands)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (text_hash, model) DO NOTHING
+    """, rows)
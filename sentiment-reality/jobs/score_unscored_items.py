@@ -1,34 +1,253 @@
 """
 Score unscored items: Query items without scores and run ML sentiment analysis.
 
-This queries the DB for items that don't have a score for model='hf_fin_v1',
-fetches the full article text, runs sentiment scoring, and writes results.
+This queries the DB for items that don't have a score under the active model
+key (see model_keys.py), fetches the full article text, runs sentiment scoring, and writes results.
+
+Full-tier article text is read from item_texts when stored, and downloaded
+(then stored) otherwise, so re-scoring never re-downloads articles.
+
+Texts already scored under another URL/ticker (syndicated copies) are served
+from the content-hash score cache instead of being run through the model.
+
+Tiers:
+- full: full article text (network fetch), stored under the model key
+- headline: title + snippet only (no network), stored under the headline key.
+  Items keep their headline score until a later full-tier run upgrades them.
 """
-from db import fetch_all, execute, is_configured
-from ingest_news import get_article_text
-from ml.sentiment import score_text
+import os
+import multiprocessing
+import item_texts
+import score_cache
+from psycopg2.extras import RealDictCursor
+from db import execute, fetch_all, execute_values, is_configured, transaction
+from ml.sentiment import score_batch, score_batch_local, MODEL_NAME
+from model_keys import get_active_model_key, get_model_name, headline_model_key
+
+TIERS = ("full", "headline")
+
+# Items scored together per model batch (chunks are length-bucketed inside)
+ITEM_BATCH_SIZE = 16
+
+# Items claimed per global-queue batch (across tickers), so the model
+# always runs on full batches even when single tickers are quiet
+GLOBAL_BATCH_ITEMS = 32
+
+# Process pool for large backfills: processes x threads_per_process should
+# roughly equal the physical core count. 1 process = score in this process.
+DEFAULT_PROCESSES = int(os.getenv("SCORE_PROCESSES", "1"))
+
+# Seconds a global-queue claim (score_leases) holds an item; work that runs
+# longer may be repeated by another scorer (writes stay idempotent)
+SCORE_LEASE_SECONDS = int(os.getenv("SCORE_LEASE_SECONDS", "600"))
+
+
+def resolve_tier_keys(tier: str, model_key: str | None = None) -> tuple[str, list[str]]:
+    """
+    Resolve (key to write, keys that count as already scored) for a tier.
+
+    Full tier: items without a full-text score (including headline-scored ones).
+    Headline tier: items with no score at all.
+
+    Raises RuntimeError if the key is registered to a different model than
+    the one this process loads, so scores are never filed under the wrong key.
+    """
+    model_key = model_key or get_active_model_key()
+
+    registered = get_model_name(model_key)
+    if registered and registered != MODEL_NAME:
+        raise RuntimeError(
+            f"Model key {model_key} expects {registered} but this process loads "
+            f"{MODEL_NAME}; set SENTIMENT_MODEL_NAME to match"
+        )
+
+    if tier == "headline":
+        return headline_model_key(model_key), [model_key, headline_model_key(model_key)]
+    return model_key, [model_key]
+
+
+def _headline_text(item: dict) -> str:
+    """Title + snippet, the text used by the headline tier and as full-text fallback."""
+    text = item["title"] or ""
+    if item["snippet"]:
+        text += "\n\n" + item["snippet"]
+    return text.strip()
+
+
+def _score_with_cache(texts: list[str], model_key: str, local: bool = False) -> tuple[list[dict], int]:
+    """
+    Score texts, reusing cached scores for content seen before.
+
+    Identical texts within the batch are scored once. Cache errors (e.g. the
+    score_cache table is missing) degrade to plain scoring. local=True scores
+    with the model this process loads even when SENTIMENT_SERVICE_URL is set.
+
+    Returns (results aligned with texts, number of cache hits).
+    """
+    scorer = score_batch_local if local else score_batch
+    try:
+        hashes, cached = score_cache.lookup(texts, model_key)
+    except Exception as e:
+        print(f"    -> Score cache unavailable: {e}")
+        return scorer(texts), 0
+
+    # Score each distinct uncached text once
+    pending = {}
+    for h, text, hit in zip(hashes, texts, cached):
+        if hit is None and h not in pending:
+            pending[h] = text
+
+    fresh = dict(zip(pending, scorer(list(pending.values()))))
+
+    # chunks_used == 0 is the neutral placeholder for a failed or empty
+    # score; caching it would pin that text (and near-duplicates) to it
+    cacheable = [
+        (h, pending[h], result) for h, result in fresh.items()
+        if result.get("chunks_used", 0) > 0
+    ]
+    if cacheable:
+        try:
+            score_cache.store(cacheable, model_key)
+        except Exception as e:
+            print(f"    -> Could not update score cache: {e}")
+
+    results = [hit if hit is not None else fresh[h] for h, hit in zip(hashes, cached)]
+    cache_hits = sum(1 for hit in cached if hit is not None)
+    return results, cache_hits
+
+
+def _init_scoring_process(threads: int):
+    """Pool initializer: pin torch's intra-op thread count for this process."""
+    import torch
+    torch.set_num_threads(threads)
+
+
+def _score_item_batch(args: tuple[int, int, list[dict], str, str, bool]) -> dict:
+    """
+    Resolve text for and score one batch of items.
+
+    Runs in the calling process or in a pool worker; results are returned
+    to the caller for a bulk write instead of being inserted here.
 
+    Args:
+        args: (offset of the batch in the full selection, total items, items,
+            tier, model key the scores are cached under, local: bypass
+            SENTIMENT_SERVICE_URL and score with this process's model)
 
-def score_unscored_items(ticker: str, limit: int = 25) -> dict:
+    Returns:
+        Dict with scores [(item_id, result)], cache_hits, skipped_no_text, errors
+    """
+    offset, total, batch, tier, model_key, local = args
+    outcome = {"scores": [], "cache_hits": 0, "skipped_no_text": 0, "errors": 0}
+
+    article_texts = {}
+    if tier == "full":
+        # Stored text first; the rest of the batch is downloaded concurrently
+        article_texts = item_texts.get_texts(batch)
+
+    batch_items = []
+    batch_texts = []
+
+    for i, item in enumerate(batch, start=offset):
+        title = item["title"] or ""
+
+        print(f"  [{i + 1}/{total}] {title[:50]}...")
+
+        try:
+            if tier == "headline":
+                text = _headline_text(item)
+            else:
+                # Fallback to title + snippet if extraction failed
+                text = article_texts.get(str(item["id"]), "").strip() or _headline_text(item)
+        except Exception as e:
+            print(f"    -> Error: {e}")
+            outcome["errors"] += 1
+            continue
+
+        # Skip if still no text
+        if not text:
+            print(f"    -> Skipped: no text available")
+            outcome["skipped_no_text"] += 1
+            continue
+
+        batch_items.append(item)
+        batch_texts.append(text)
+
+    if not batch_items:
+        return outcome
+
+    try:
+        results, cache_hits = _score_with_cache(batch_texts, model_key, local=local)
+    except Exception as e:
+        print(f"    -> Error scoring batch: {e}")
+        outcome["errors"] += len(batch_items)
+        return outcome
+
+    outcome["cache_hits"] = cache_hits
+    for item, result in zip(batch_items, results):
+        print(f"    -> {(item['title'] or '')[:30]}: {result['sentiment_label']} ({result['sentiment_score']:.2f}, {result.get('chunks_used', 'cached')} chunks)")
+        outcome["scores"].append((item["id"], result))
+
+    return outcome
+
+
+def _write_scores(scores: list[tuple], model_key: str, conn=None) -> None:
+    """Bulk insert item scores (idempotent with ON CONFLICT DO NOTHING)."""
+    execute_values("""
+        INSERT INTO item_scores (item_id, model, sentiment_label, sentiment_score, confidence)
+        VALUES %s
+        ON CONFLICT (item_id, model) DO NOTHING
+    """, [
+        (
+            item_id,
+            model_key,
+            result["sentiment_label"],
+            result["sentiment_score"],
+            result["confidence"],
+        )
+        for item_id, result in scores
+    ], conn=conn)
+
+
+def score_unscored_items(
+    ticker: str,
+    limit: int = 25,
+    processes: int | None = None,
+    threads_per_process: int | None = None,
+    tier: str = "full",
+) -> dict:
     """
     Find and score items that don't have sentiment scores yet.
 
     Args:
         ticker: Stock symbol (e.g., 'TSLA')
         limit: Max items to process in one run (default 25)
+        processes: Scoring processes (default SCORE_PROCESSES, 1 = in-process).
+            With >1, item batches are spread across a process pool.
+        threads_per_process: torch threads per pool process
+            (default: cpu_count // processes)
+        tier: "full" (article text, model key) or "headline" (title + snippet,
+            headline key). Full tier also upgrades headline-scored items.
 
     Returns:
         Summary dict with:
         - ticker: str
+        - tier: str
         - selected: int (items found without scores)
         - scored: int (successfully scored)
+        - cache_hits: int (scores reused from score_cache)
         - skipped_no_text: int (no text available)
         - errors: int (scoring/DB errors)
     """
+    if tier not in TIERS:
+        raise ValueError(f"Unknown scoring tier: {tier} (expected one of {TIERS})")
+
     summary = {
         "ticker": ticker,
+        "tier": tier,
         "selected": 0,
         "scored": 0,
+        "cache_hits": 0,
         "skipped_no_text": 0,
         "errors": 0,
     }
@@ -37,19 +256,20 @@ def score_unscored_items(ticker: str, limit: int = 25) -> dict:
         print("ERROR: Database not configured. Set DATABASE_URL in .env")
         return summary
 
-    # Query for items without scores for model='hf_fin_v1'
-    print(f"Finding unscored items for {ticker} (limit {limit})...")
+    model_key, scored_keys = resolve_tier_keys(tier)
+    print(f"Finding unscored items for {ticker} (limit {limit}, tier {tier})...")
 
     unscored = fetch_all("""
         SELECT i.id, i.url, i.title, i.snippet
         FROM items i
-        LEFT JOIN item_scores s
-            ON s.item_id = i.id AND s.model = 'hf_fin_v1'
         WHERE i.ticker = %s
-            AND s.item_id IS NULL
+            AND NOT EXISTS (
+                SELECT 1 FROM item_scores s
+                WHERE s.item_id = i.id AND s.model = ANY(%s)
+            )
         ORDER BY i.published_at DESC
         LIMIT %s
-    """, (ticker, limit))
+    """, (ticker, scored_keys, limit))
 
     summary["selected"] = len(unscored)
 
@@ -59,53 +279,172 @@ def score_unscored_items(ticker: str, limit: int = 25) -> dict:
 
     print(f"Found {len(unscored)} unscored items")
 
-    for i, item in enumerate(unscored):
-        item_id = item["id"]
-        url = item["url"]
-        title = item["title"] or ""
-        snippet = item["snippet"] or ""
+    batches = [
+        (start, len(unscored), unscored[start:start + ITEM_BATCH_SIZE], tier, model_key, False)
+        for start in range(0, len(unscored), ITEM_BATCH_SIZE)
+    ]
+
+    processes = min(processes or DEFAULT_PROCESSES, len(batches))
+
+    def collect(outcomes):
+        for outcome in outcomes:
+            summary["cache_hits"] += outcome["cache_hits"]
+            summary["skipped_no_text"] += outcome["skipped_no_text"]
+            summary["errors"] += outcome["errors"]
+            try:
+                _write_scores(outcome["scores"], model_key)
+                summary["scored"] += len(outcome["scores"])
+            except Exception as e:
+                print(f"    -> Error writing scores: {e}")
+                summary["errors"] += len(outcome["scores"])
+
+    if processes > 1:
+        threads = threads_per_process or max(1, (os.cpu_count() or 1) // processes)
+        print(f"Scoring with {processes} processes x {threads} threads")
+
+        # spawn: forking after torch has started its thread pools can deadlock
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(processes, initializer=_init_scoring_process, initargs=(threads,)) as pool:
+            collect(pool.imap_unordered(_score_item_batch, batches))
+    else:
+        if tier == "full":
+            # Article downloads run ahead of the model, batch after batch
+            item_texts.prefetch_missing(unscored)
+        collect(map(_score_item_batch, batches))
+
+    return summary
 
-        print(f"  [{i + 1}/{len(unscored)}] {title[:50]}...")
+
+def _claim_items(model_key: str, scored_keys: list[str], exclude_ids: list[str], limit: int) -> list[dict]:
+    """
+    Lease up to `limit` unscored, unleased items (newest first) in one short
+    transaction; returns the claimed items.
+    """
+    with transaction() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                WITH candidates AS (
+                    SELECT i.id
+                    FROM items i
+                    JOIN tracked_stocks t ON t.ticker = i.ticker AND t.is_active
+                    WHERE NOT EXISTS (
+                            SELECT 1 FROM item_scores s
+                            WHERE s.item_id = i.id AND s.model = ANY(%s)
+                        )
+                        AND NOT EXISTS (
+                            SELECT 1 FROM score_leases l
+                            WHERE l.item_id = i.id AND l.model = %s AND l.leased_until > now()
+                        )
+                        AND i.id::text <> ALL(%s)
+                    ORDER BY i.published_at DESC
+                    LIMIT %s
+                    FOR NO KEY UPDATE OF i SKIP LOCKED
+                ),
+                leased AS (
+                    INSERT INTO score_leases (item_id, model, leased_until)
+                    SELECT id, %s, now() + make_interval(secs => %s)
+                    FROM candidates
+                    ON CONFLICT (item_id, model) DO UPDATE
+                        SET leased_until = EXCLUDED.leased_until
+                        WHERE score_leases.leased_until <= now()
+                    RETURNING item_id
+                )
+                SELECT i.id, i.ticker, i.url, i.title, i.snippet
+                FROM items i
+                JOIN leased l ON l.item_id = i.id
+                ORDER BY i.published_at DESC
+            """, (scored_keys, model_key, exclude_ids, limit, model_key, SCORE_LEASE_SECONDS))
+            return [dict(row) for row in cur.fetchall()]
+
+
+def _release_items(items: list[dict], model_key: str, conn=None) -> None:
+    """Delete the score_leases of claimed items."""
+    sql = "DELETE FROM score_leases WHERE model = %s AND item_id = ANY(%s::uuid[])"
+    params = (model_key, [str(item["id"]) for item in items])
+    if conn is None:
+        execute(sql, params)
+        return
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+
+
+def score_unscored_global(limit: int = 200, tier: str = "full") -> dict:
+    """
+    Score unscored items across all active tickers, most recent first.
+
+    Items are claimed in batches of GLOBAL_BATCH_ITEMS by leasing them in
+    score_leases for SCORE_LEASE_SECONDS (a short transaction using
+    FOR NO KEY UPDATE SKIP LOCKED), scored outside any transaction, then
+    written together with the lease release in a second short transaction.
+    Several scorers can run this concurrently without double-scoring, and
+    no row locks are held during downloads and inference. (NO KEY keeps the
+    item_scores foreign-key checks of other sessions from blocking on rows
+    being claimed.)
+
+    Args:
+        limit: Max items to process in this run
+        tier: "full" or "headline" (see score_unscored_items)
+
+    Returns:
+        Summary dict with selected, scored, cache_hits, skipped_no_text,
+        errors, and tickers (sorted list of tickers that got new scores)
+    """
+    if tier not in TIERS:
+        raise ValueError(f"Unknown scoring tier: {tier} (expected one of {TIERS})")
+
+    summary = {
+        "tier": tier,
+        "selected": 0,
+        "scored": 0,
+        "cache_hits": 0,
+        "skipped_no_text": 0,
+        "errors": 0,
+        "tickers": [],
+    }
+
+    if not is_configured():
+        print("ERROR: Database not configured. Set DATABASE_URL in .env")
+        return summary
+
+    model_key, scored_keys = resolve_tier_keys(tier)
+    tickers = set()
+    # Items that stay unscored (no text, errors) are not re-claimed this run
+    seen_ids = []
+
+    print(f"Scoring unscored items across tickers (limit {limit}, tier {tier})...")
+
+    while summary["selected"] < limit:
+        batch_size = min(GLOBAL_BATCH_ITEMS, limit - summary["selected"])
+
+        claimed = _claim_items(model_key, scored_keys, seen_ids, batch_size)
+        if not claimed:
+            break
+
+        offset = summary["selected"]
+        summary["selected"] += len(claimed)
+        seen_ids.extend(str(item["id"]) for item in claimed)
 
         try:
-            # Try to get full article text
-            text = get_article_text(url)
-
-            # Fallback to title + snippet if extraction fails
-            if not text or not text.strip():
-                fallback_text = title
-                if snippet:
-                    fallback_text += "\n\n" + snippet
-                text = fallback_text.strip()
-
-            # Skip if still no text
-            if not text:
-                print(f"    -> Skipped: no text available")
-                summary["skipped_no_text"] += 1
-                continue
-
-            # Score the text
-            result = score_text(text)
-
-            # Insert into item_scores (idempotent with ON CONFLICT DO NOTHING)
-            execute("""
-                INSERT INTO item_scores (item_id, model, sentiment_label, sentiment_score, confidence)
-                VALUES (%s, 'hf_fin_v1', %s, %s, %s)
-                ON CONFLICT (item_id, model) DO NOTHING
-            """, (
-                item_id,
-                result["sentiment_label"],
-                result["sentiment_score"],
-                result["confidence"],
-            ))
-
-            print(f"    -> {result['sentiment_label']} ({result['sentiment_score']:.2f}, {result['chunks_used']} chunks)")
-            summary["scored"] += 1
+            outcome = _score_item_batch((offset, limit, claimed, tier, model_key, False))
+        except BaseException:
+            _release_items(claimed, model_key)
+            raise
+        summary["cache_hits"] += outcome["cache_hits"]
+        summary["skipped_no_text"] += outcome["skipped_no_text"]
+        summary["errors"] += outcome["errors"]
 
-        except Exception as e:
-            print(f"    -> Error: {e}")
-            summary["errors"] += 1
-            continue
+        with transaction() as conn:
+            _write_scores(outcome["scores"], model_key, conn=conn)
+            _release_items(claimed, model_key, conn=conn)
+        summary["scored"] += len(outcome["scores"])
+
+        scored_ids = {item_id for item_id, _ in outcome["scores"]}
+        tickers.update(item["ticker"] for item in claimed if item["id"] in scored_ids)
+
+    summary["tickers"] = sorted(tickers)
+
+    if not summary["selected"]:
+        print("No unscored items found")
 
     return summary
 
@@ -114,20 +453,44 @@ if __name__ == "__main__":
     import sys
 
     if len(sys.argv) < 2:
-        print("Usage: python score_unscored_items.py <TICKER> [limit]")
+        print("Usage: python score_unscored_items.py <TICKER> [limit] [processes] [threads_per_process]")
+        print("       python score_unscored_items.py --global [limit]")
         print("Example: python score_unscored_items.py TSLA 25")
+        print("Example: python score_unscored_items.py TSLA 2000 4 2")
+        print("Example: python score_unscored_items.py --global 500")
         sys.exit(1)
 
+    if sys.argv[1] == "--global":
+        limit = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+        print(f"\n=== Scoring unscored items across all tickers ===\n")
+        result = score_unscored_global(limit=limit)
+
+        print(f"\n=== Summary ===")
+        print(f"  Selected: {result['selected']}")
+        print(f"  Scored: {result['scored']}")
+        print(f"  Cache hits: {result['cache_hits']}")
+        print(f"  Skipped (no text): {result['skipped_no_text']}")
+        print(f"  Errors: {result['errors']}")
+        print(f"  Tickers: {', '.join(result['tickers']) or '-'}")
+        print()
+        sys.exit(0)
+
     ticker = sys.argv[1].upper()
     limit = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    processes = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    threads = int(sys.argv[4]) if len(sys.argv) > 4 else None
 
     print(f"\n=== Scoring unscored items for {ticker} ===\n")
-    result = score_unscored_items(ticker, limit=limit)
+    result = score_unscored_items(
+        ticker, limit=limit, processes=processes, threads_per_process=threads
+    )
 
     print(f"\n=== Summary ===")
     print(f"  Ticker: {result['ticker']}")
     print(f"  Selected: {result['selected']}")
     print(f"  Scored: {result['scored']}")
+    print(f"  Cache hits: {result['cache_hits']}")
     print(f"  Skipped (no text): {result['skipped_no_text']}")
     print(f"  Errors: {result['errors']}")
     print()
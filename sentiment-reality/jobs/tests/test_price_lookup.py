@@ -0,0 +1,77 @@
+"""PriceLookup coverage of prices_daily vs the price history download."""
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import pytest
+from providers.price_lookup import PriceLookup, last_weekday
+
+
+def daily_closes(start: date, end: date) -> dict[date, float]:
+    """Weekday closes from start to end, rising one per calendar day."""
+    closes, day = {}, start
+    while day <= end:
+        if day.weekday() < 5:
+            closes[day] = 100.0 + (day - date(2026, 1, 1)).days
+        day += timedelta(days=1)
+    return closes
+
+
+@pytest.fixture
+def lookup(monkeypatch):
+    """PriceLookup over fake stored rows and a recording fake download."""
+    lookup = PriceLookup("TSLA")
+    lookup.stored = {}
+    lookup.downloads = []
+
+    def load_from_db(start, end):
+        return {d: c for d, c in lookup.stored.items() if start <= d <= end}
+
+    def load_from_yfinance(start, end):
+        lookup.downloads.append((start, end))
+        return daily_closes(start, end)
+
+    monkeypatch.setattr(lookup, "_load_from_db", load_from_db)
+    monkeypatch.setattr(lookup, "_load_from_yfinance", load_from_yfinance)
+    return lookup
+
+
+def test_last_weekday():
+    assert last_weekday(date(2026, 10, 14)) == date(2026, 10, 14)  # Wednesday
+    assert last_weekday(date(2026, 10, 17)) == date(2026, 10, 16)  # Saturday
+    assert last_weekday(date(2026, 10, 18)) == date(2026, 10, 16)  # Sunday
+
+
+def test_stored_rows_ending_day_before_article_are_topped_up(lookup):
+    article_day = date(2026, 10, 14)  # Wednesday
+    lookup.stored = daily_closes(date(2026, 9, 1), article_day - timedelta(days=1))
+
+    result = lookup.annotate(article_day)
+
+    assert lookup.downloads == [(article_day, article_day)]
+    assert result["price"] is not None
+    assert result["price_direction"] == "up"
+
+
+def test_stored_rows_through_friday_cover_weekend_article(lookup):
+    lookup.stored = daily_closes(date(2026, 9, 1), date(2026, 10, 16))
+
+    result = lookup.annotate(date(2026, 10, 18))  # Sunday: no bar that day
+
+    assert lookup.downloads == []
+    assert result["price"] is None
+
+
+def test_stored_rows_covering_range_skip_download(lookup):
+    lookup.stored = daily_closes(date(2026, 9, 1), date(2026, 10, 14))
+
+    result = lookup.annotate(date(2026, 10, 14))
+
+    assert lookup.downloads == []
+    assert result["price"] == round(lookup.stored[date(2026, 10, 14)], 2)
+
+
+def test_no_stored_rows_downloads_whole_range(lookup):
+    lookup.annotate(date(2026, 10, 14))
+
+    assert lookup.downloads == [(date(2026, 10, 7), date(2026, 10, 14))]
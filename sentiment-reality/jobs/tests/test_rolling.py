@@ -0,0 +1,94 @@
+"""compute.rolling vs the per-window reference, compute.metrics._compute_window_metrics."""
+import random
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import pytest
+from compute.metrics import _compute_window_metrics
+from compute.rolling import (
+    ALIGNED_THRESHOLD,
+    MISLEADING_THRESHOLD,
+    metrics_rows,
+    rolling_metrics,
+    rolling_metrics_multi,
+)
+
+# One unit in the 4th decimal: rounding of nearly equal floats
+TOLERANCE = 1.5e-4
+
+
+def assert_matches_reference(sentiments, returns, window):
+    fast = rolling_metrics(sentiments, returns, window)
+    expected = [
+        _compute_window_metrics(sentiments[i - window + 1:i + 1], returns[i - window + 1:i + 1])
+        for i in range(window - 1, len(sentiments))
+    ]
+    assert len(fast["interpretation"]) == len(expected)
+
+    for i, reference in enumerate(expected):
+        for key in ("corr", "directional_match", "alignment_score"):
+            assert fast[key][i] == pytest.approx(reference[key], abs=TOLERANCE), (key, i)
+        assert fast["misalignment_days"][i] == reference["misalignment_days"], i
+        near_threshold = min(
+            abs(reference["alignment_score"] - ALIGNED_THRESHOLD),
+            abs(reference["alignment_score"] - MISLEADING_THRESHOLD),
+        ) < 1e-4
+        if not near_threshold:
+            assert fast["interpretation"][i] == reference["interpretation"], i
+
+
+def random_series(rng: random.Random, n: int) -> tuple[list[float], list[float]]:
+    """Sentiments in [-1, 1] and returns, both with some exact zeros."""
+    sentiments = [rng.choice([0.0, rng.uniform(-1, 1)]) for _ in range(n)]
+    returns = [rng.choice([0.0, rng.gauss(0, 2)]) for _ in range(n)]
+    return sentiments, returns
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_random_series_match_reference(seed):
+    rng = random.Random(seed)
+    sentiments, returns = random_series(rng, rng.randint(1, 120))
+    assert_matches_reference(sentiments, returns, rng.randint(1, 40))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_constant_windows_match_reference(seed):
+    # Sentiment std below MIN_STD: corr is 0
+    rng = random.Random(seed)
+    n = rng.randint(1, 120)
+    _, returns = random_series(rng, n)
+    assert_matches_reference([0.25] * n, returns, rng.randint(1, 40))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_large_magnitudes_match_reference(seed):
+    rng = random.Random(seed)
+    sentiments, returns = random_series(rng, rng.randint(1, 120))
+    returns = [round(r, 1) * 100 for r in returns]
+    assert_matches_reference(sentiments, returns, rng.randint(1, 40))
+
+
+def test_fewer_points_than_window_is_empty():
+    metrics = rolling_metrics([0.1, -0.2, 0.3], [1.0, -1.0, 2.0], 7)
+    assert len(metrics["corr"]) == 0
+    assert metrics["interpretation"] == []
+    assert rolling_metrics([], [], 7)["interpretation"] == []
+
+
+def test_multi_matches_single_window():
+    sentiments, returns = random_series(random.Random(1), 90)
+    multi = rolling_metrics_multi(sentiments, returns, [7, 14, 30])
+    for window, metrics in multi.items():
+        single = rolling_metrics(sentiments, returns, window)
+        assert metrics["corr"].tolist() == single["corr"].tolist()
+        assert metrics["interpretation"] == single["interpretation"]
+
+
+def test_metrics_rows_end_dates():
+    sentiments, returns = random_series(random.Random(2), 10)
+    dates = [f"2026-01-{day:02d}" for day in range(1, 11)]
+    rows = metrics_rows("TSLA", dates, sentiments, returns, [3, 7])
+    assert [(row[1], row[2]) for row in rows if row[2] == 7] == [
+        (date, 7) for date in dates[6:]
+    ]
+    assert len(rows) == 8 + 4
@@ -1,13 +1,14 @@
 """
 Update current stock prices every hour.
 
-This script fetches the current price for all tracked stocks
-and stores them in the current_prices table.
+This script fetches the current price for all tracked stocks (in bulk,
+one multi-symbol download per batch of tickers) and stores them in the
+current_prices table.
 """
 import sys
 from datetime import datetime, timezone
-import yfinance as yf
 from db import query, execute
+from providers.prices import fetch_current_prices
 
 
 def get_current_price(ticker: str) -> dict:
@@ -20,44 +21,11 @@ def get_current_price(ticker: str) -> dict:
     Returns:
         Dict with price, price_change, and price_direction
     """
-    try:
-        ticker_obj = yf.Ticker(ticker)
-        info = ticker_obj.info
-        
-        current_price = info.get('currentPrice') or info.get('regularMarketPrice')
-        previous_close = info.get('previousClose')
-        
-        if not current_price:
-            return {
-                'price': None,
-                'price_change': None,
-                'price_direction': 'unknown'
-            }
-        
-        # Calculate price change
-        price_change = None
-        price_direction = 'neutral'
-        
-        if previous_close:
-            price_change = round(current_price - previous_close, 2)
-            if price_change > 0:
-                price_direction = 'up'
-            elif price_change < 0:
-                price_direction = 'down'
-        
-        return {
-            'price': round(current_price, 2),
-            'price_change': price_change,
-            'price_direction': price_direction
-        }
-    
-    except Exception as e:
-        print(f"  Error fetching current price for {ticker}: {e}")
-        return {
-            'price': None,
-            'price_change': None,
-            'price_direction': 'unknown'
-        }
+    return fetch_current_prices([ticker]).get(ticker.upper(), {
+        'price': None,
+        'price_change': None,
+        'price_direction': 'unknown'
+    })
 
 
 def update_current_prices():
@@ -83,13 +51,13 @@ def update_current_prices():
         
         print(f"Found {total} tracked stocks\n")
         
+        prices = fetch_current_prices([stock['ticker'] for stock in stocks])
+        
         for i, stock in enumerate(stocks, 1):
             ticker = stock['ticker']
+            price_data = prices.get(ticker.upper())
             
-            # Fetch current price
-            price_data = get_current_price(ticker)
-            
-            if price_data['price'] is None:
+            if price_data is None:
                 errors += 1
                 print(f"  [{i}/{total}] ❌ ERROR: No price data for {ticker}")
                 continue
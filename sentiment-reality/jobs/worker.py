@@ -6,13 +6,22 @@ Task types:
 - REFRESH_STOCK: Refresh data for a single ticker (user-triggered)
 - BACKFILL_STOCK: Full 30-day backfill for a single ticker
 - BACKFILL_DEFAULTS: Backfill all 5 default tickers (TSLA, NVDA, JPM, PFE, GME)
+- UPGRADE_SCORES: Full-text rescoring of headline-tier items for a ticker,
+  then recompute its aggregates (queued by DAILY_UPDATE_ALL)
+- SCORE_GLOBAL: Score unscored items across all tickers (most recent first),
+  then recompute aggregates for the tickers that got new scores. Several
+  workers can run this at once; items are claimed with SKIP LOCKED.
 
 Safe claiming uses FOR UPDATE SKIP LOCKED to prevent double-processing.
+
+The sentiment model is loaded and warmed up once when the loop starts
+(WORKER_WARMUP=0 to skip), so the first task is not slowed by the cold load.
 """
+import os
 import time
 import json
 from db import fetch_all, execute, get_connection
-from pipeline import run_pipeline_for_ticker
+from pipeline import prefetch_prices, run_pipeline_for_ticker
 from alignment import insert_alignment_result
 from datetime import datetime
 
@@ -24,6 +33,24 @@ DAILY_PARAMS = {
     "agg_days": 90,
     "metrics_days": 90,
     "window_days": 7,
+    "score_tier": "headline",  # Fast title+snippet scores, upgraded by UPGRADE_SCORES
+}
+
+UPGRADE_PARAMS = {
+    "score_limit": 200,
+    "agg_days": 90,
+    "metrics_days": 90,
+    "window_days": 7,
+}
+
+UPGRADE_PRIORITY = 5
+
+SCORE_GLOBAL_PARAMS = {
+    "score_limit": 500,
+    "score_tier": "full",
+    "agg_days": 90,
+    "metrics_days": 90,
+    "window_days": 7,
 }
 
 REFRESH_PARAMS = {
@@ -42,10 +69,16 @@ BACKFILL_PARAMS = {
     "agg_days": 30,
     "metrics_days": 30,
     "window_days_list": [7, 14, 30],  # Multiple windows
+    "score_processes": None,  # None = SCORE_PROCESSES env (default 1)
 }
 
 DEFAULT_TICKERS = ["TSLA", "NVDA", "JPM", "PFE", "GME"]
 
+# DAILY_UPDATE_ALL re-fetches the full prices_days range (instead of only
+# the missing tail) on this UTC weekday, Monday=0 (payload "prices_full"
+# overrides), to reconcile adjusted history after splits and dividends
+PRICES_RECONCILE_WEEKDAY = int(os.getenv("PRICES_RECONCILE_WEEKDAY", "6"))
+
 MAX_ATTEMPTS = 3
 
 
@@ -120,12 +153,28 @@ def complete_task(task_id: str, result: dict = None, error: str = None):
             """, (task_id,))
 
 
+def enqueue_upgrade_scores(ticker: str) -> bool:
+    """Queue an UPGRADE_SCORES task for ticker unless one is already pending."""
+    queued = execute("""
+        INSERT INTO tasks (task_type, ticker, priority, status)
+        SELECT 'UPGRADE_SCORES', %s, %s, 'PENDING'
+        WHERE NOT EXISTS (
+            SELECT 1 FROM tasks
+            WHERE task_type = 'UPGRADE_SCORES' AND ticker = %s AND status = 'PENDING'
+        )
+    """, (ticker, UPGRADE_PRIORITY, ticker))
+    return queued > 0
+
+
 def handle_daily_update_all(task: dict) -> dict:
     """
     DAILY_UPDATE_ALL: Run full pipeline for all active tickers.
 
     Does NOT enqueue separate tasks - runs pipeline directly for each ticker.
     """
+    from api_budget import remaining_requests
+    from ingest_news import NEWSAPI_DAILY_BUDGET, NEWSAPI_MAX_REQUESTS_PER_RUN
+
     print("\n" + "=" * 60)
     print("DAILY_UPDATE_ALL: Processing all active tickers")
     print("=" * 60)
@@ -143,11 +192,24 @@ def handle_daily_update_all(task: dict) -> dict:
     payload = task.get("payload", {})
     params = {**DAILY_PARAMS, **payload}
 
+    prices_full = params.get(
+        "prices_full", datetime.utcnow().weekday() == PRICES_RECONCILE_WEEKDAY
+    )
+
+    # One bulk price download for every ticker; each pipeline run reads from it
+    prefetch_prices([row["ticker"] for row in tickers], params["prices_days"], full=prices_full)
+
     results = {}
     today = datetime.utcnow().strftime("%Y-%m-%d")
-    for row in tickers:
+    for i, row in enumerate(tickers):
         ticker = row["ticker"]
         try:
+            # Split what's left of today's NewsAPI budget over the remaining tickers
+            remaining = remaining_requests("newsapi", NEWSAPI_DAILY_BUDGET)
+            news_max_requests = max(1, min(
+                NEWSAPI_MAX_REQUESTS_PER_RUN, remaining // (len(tickers) - i)
+            ))
+
             result = run_pipeline_for_ticker(
                 ticker=ticker,
                 news_hours=params["news_hours"],
@@ -156,13 +218,23 @@ def handle_daily_update_all(task: dict) -> dict:
                 agg_days=params["agg_days"],
                 metrics_days=params["metrics_days"],
                 window_days=params["window_days"],
+                score_tier=params["score_tier"],
+                news_max_requests=news_max_requests,
+                prices_full=prices_full,
             )
             # Insert alignment result for today
             alignment_success = insert_alignment_result(ticker, today)
+
+            # Headline-tier scores get upgraded to full-text in the background
+            upgrade_queued = False
+            if params["score_tier"] == "headline":
+                upgrade_queued = enqueue_upgrade_scores(ticker)
+
             results[ticker] = {
                 "success": result["success"],
                 "elapsed": result["elapsed_seconds"],
                 "alignment_inserted": alignment_success,
+                "upgrade_queued": upgrade_queued,
             }
         except Exception as e:
             print(f"Error processing {ticker}: {e}")
@@ -243,6 +315,8 @@ def handle_backfill_stock(task: dict) -> dict:
         agg_days=params.get("agg_days", BACKFILL_PARAMS["agg_days"]),
         metrics_days=params.get("metrics_days", BACKFILL_PARAMS["metrics_days"]),
         window_days_list=params.get("window_days_list", BACKFILL_PARAMS["window_days_list"]),
+        score_processes=params.get("score_processes", BACKFILL_PARAMS["score_processes"]),
+        prices_full=True,
     )
 
     print(f"\n{'='*60}")
@@ -263,6 +337,8 @@ def handle_backfill_defaults(task: dict) -> dict:
     print(f"  Tickers: {', '.join(DEFAULT_TICKERS)}")
     print(f"{'='*60}")
 
+    prefetch_prices(DEFAULT_TICKERS, BACKFILL_PARAMS["prices_days"], full=True)
+
     results = {}
     for ticker in DEFAULT_TICKERS:
         try:
@@ -275,6 +351,8 @@ def handle_backfill_defaults(task: dict) -> dict:
                 agg_days=BACKFILL_PARAMS["agg_days"],
                 metrics_days=BACKFILL_PARAMS["metrics_days"],
                 window_days_list=BACKFILL_PARAMS["window_days_list"],
+                score_processes=BACKFILL_PARAMS["score_processes"],
+                prices_full=True,
             )
             results[ticker] = {
                 "success": result.get("success", False),
@@ -291,6 +369,82 @@ def handle_backfill_defaults(task: dict) -> dict:
     return {"tickers": DEFAULT_TICKERS, "results": results}
 
 
+def handle_upgrade_scores(task: dict) -> dict:
+    """
+    UPGRADE_SCORES: Replace headline-tier scores with full-text scores.
+
+    Scores items lacking a full-text score (fetching article text), then
+    recomputes daily aggregates and metrics so the dashboard picks them up.
+    """
+    from pipeline import score_items, compute_daily_agg, compute_metrics_windowed
+
+    ticker = task.get("ticker")
+    if not ticker:
+        ticker = task.get("payload", {}).get("ticker")
+
+    if not ticker:
+        raise ValueError("No ticker specified in task")
+
+    print(f"\n{'='*60}")
+    print(f"UPGRADE_SCORES: {ticker}")
+    print(f"{'='*60}")
+
+    payload = task.get("payload", {})
+    params = {**UPGRADE_PARAMS, **payload}
+
+    score_result = score_items(ticker, limit=params["score_limit"], tier="full")
+    agg_result = compute_daily_agg(ticker, days=params["agg_days"])
+    metrics_result = compute_metrics_windowed(
+        ticker, window_days=params["window_days"], days=params["metrics_days"]
+    )
+
+    print(f"\n{'='*60}")
+    print(f"UPGRADE_SCORES COMPLETE: {ticker} ({score_result.get('scored', 0)} upgraded)")
+    print(f"{'='*60}")
+
+    return {
+        "ticker": ticker,
+        "score_items": score_result,
+        "daily_agg": agg_result,
+        "metrics": metrics_result,
+    }
+
+
+def handle_score_global(task: dict) -> dict:
+    """
+    SCORE_GLOBAL: Score unscored items across all active tickers.
+
+    Uses the cross-ticker queue in score_unscored_items, then recomputes
+    daily aggregates and metrics for every ticker that received scores.
+    """
+    from score_unscored_items import score_unscored_global
+    from pipeline import compute_daily_agg, compute_metrics_windowed
+
+    print(f"\n{'='*60}")
+    print("SCORE_GLOBAL: Scoring across all tickers")
+    print(f"{'='*60}")
+
+    payload = task.get("payload", {})
+    params = {**SCORE_GLOBAL_PARAMS, **payload}
+
+    score_result = score_unscored_global(
+        limit=params["score_limit"], tier=params["score_tier"]
+    )
+
+    for ticker in score_result["tickers"]:
+        compute_daily_agg(ticker, days=params["agg_days"])
+        compute_metrics_windowed(
+            ticker, window_days=params["window_days"], days=params["metrics_days"]
+        )
+
+    print(f"\n{'='*60}")
+    print(f"SCORE_GLOBAL COMPLETE: {score_result['scored']} scored across "
+          f"{len(score_result['tickers'])} tickers")
+    print(f"{'='*60}")
+
+    return score_result
+
+
 def run_once() -> bool:
     """
     Process one task and return.
@@ -318,6 +472,10 @@ def run_once() -> bool:
             result = handle_backfill_stock(task)
         elif task_type == "BACKFILL_DEFAULTS":
             result = handle_backfill_defaults(task)
+        elif task_type == "UPGRADE_SCORES":
+            result = handle_upgrade_scores(task)
+        elif task_type == "SCORE_GLOBAL":
+            result = handle_score_global(task)
         else:
             raise ValueError(f"Unknown task type: {task_type}")
 
@@ -339,7 +497,19 @@ def run_once() -> bool:
         return True
 
 
-def run_loop(poll_interval: int = 10):
+def warm_up_model():
+    """Load the sentiment model before polling so the first task runs at full speed."""
+    try:
+        from ml.sentiment import warm_up
+        print("[WORKER] Warming up sentiment model...")
+        elapsed = warm_up()
+        print(f"[WORKER] Model ready in {elapsed:.1f}s")
+    except Exception as e:
+        # Tasks will load the model on demand instead
+        print(f"[WORKER] Model warm-up failed: {e}")
+
+
+def run_loop(poll_interval: int = 10, warm_up: bool = True):
     """Continuously poll for tasks."""
     print("=" * 60)
     print("WORKER: Starting task loop")
@@ -347,6 +517,9 @@ def run_loop(poll_interval: int = 10):
     print("  Press Ctrl+C to stop")
     print("=" * 60)
 
+    if warm_up:
+        warm_up_model()
+
     while True:
         try:
             if not run_once():
@@ -366,4 +539,4 @@ if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == "--once":
         run_once()
     else:
-        run_loop()
+        run_loop(warm_up=os.getenv("WORKER_WARMUP", "1") == "1")